@@ -0,0 +1,180 @@
+// Frequency measurement engine for Pi Pico RP2040 or RP2350
+// Shared by picofreq.c firmware, and picofreq_native MicroPython module
+//
+// Copyright (c) Jeremy P Bentham 2023
+
+// v0.01 agent 19/10/26 Adapted from picofreq.c v0.02
+//                      Corrected overflow multiplier (65537 -> 65536)
+// v0.02 agent 19/10/26 FE_HOST_TEST build option, for host test
+
+#include "freq_engine.h"
+
+// PWM slice registers (32-bit word offsets)
+#define PWM_SLICE_WORDS     5
+#define PWM_CSR             0
+#define PWM_CTR             2
+#define PWM_CSR_EN          (1 << 0)
+
+// DMA channel registers (32-bit word offsets)
+#define DMA_CHAN_WORDS      16
+#define DMA_READ_ADDR       0
+#define DMA_WRITE_ADDR      1
+#define DMA_TRANS_COUNT     2
+#define DMA_AL1_CTRL        4
+#define DMA_AL1_COUNT_TRIG  7
+#define DMA_CTRL_EN         (1 << 0)
+#define DMA_COUNT_MASK      0xfffffff   // RP2350 has mode in top 4 bits
+
+static volatile uint32_t *pwm_slice(const fe_hw *hw, int slice)
+{
+    return (hw->pwm_base + slice * PWM_SLICE_WORDS);
+}
+
+static volatile uint32_t *dma_chan(const fe_hw *hw, int chan)
+{
+    return (hw->dma_base + chan * DMA_CHAN_WORDS);
+}
+
+// Abort DMA transfer, and wait until complete
+// Host test uses memory for the registers, so abort bit doesn't clear
+static void dma_abort(const fe_hw *hw, int chan)
+{
+    *hw->dma_abort = 1u << chan;
+#ifndef FE_HOST_TEST
+    while (*hw->dma_abort & (1u << chan)) ;
+#endif
+}
+
+// Enable DMA channel, and start transfer (without changing other settings)
+static void dma_start(const fe_hw *hw, int chan, uint32_t count)
+{
+    dma_chan(hw, chan)[DMA_AL1_CTRL] |= DMA_CTRL_EN;
+    dma_chan(hw, chan)[DMA_AL1_COUNT_TRIG] = count;
+}
+
+// Get number of DMA transfers remaining
+static uint32_t dma_count(const fe_hw *hw, int chan)
+{
+    return (dma_chan(hw, chan)[DMA_TRANS_COUNT] & DMA_COUNT_MASK);
+}
+
+// Initialise gated counter; counter must be disabled, and DMA configured
+void fe_gate_init(fe_gate *g, const fe_hw *hw, int counter_slice, int gate_slice,
+                  int gate_chan, int wrap_chan)
+{
+    g->hw = hw;
+    g->counter_slice = counter_slice;
+    g->gate_slice = gate_slice;
+    g->gate_chan = gate_chan;
+    g->wrap_chan = wrap_chan;
+    g->csr_stopval = pwm_slice(hw, counter_slice)[PWM_CSR] & ~PWM_CSR_EN;
+    g->wraps = 0;
+    dma_chan(hw, gate_chan)[DMA_WRITE_ADDR] = (uint32_t)(uintptr_t)&pwm_slice(hw, counter_slice)[PWM_CSR];
+}
+
+// Start gated counter
+void fe_gate_start(fe_gate *g)
+{
+    const fe_hw *hw = g->hw;
+
+    dma_abort(hw, g->gate_chan);
+    dma_chan(hw, g->gate_chan)[DMA_READ_ADDR] = (uint32_t)(uintptr_t)&g->csr_stopval;
+    dma_start(hw, g->gate_chan, 1);
+    if (g->wrap_chan != FE_NO_CHAN)
+    {
+        dma_abort(hw, g->wrap_chan);
+        dma_start(hw, g->wrap_chan, FE_DMA_COUNT_MAX);
+    }
+    pwm_slice(hw, g->counter_slice)[PWM_CTR] = 0;
+    pwm_slice(hw, g->gate_slice)[PWM_CTR] = 0;
+    g->wraps = 0;
+    *hw->pwm_en |= (1u << g->counter_slice) | (1u << g->gate_slice);
+}
+
+// Check if gate time is complete
+bool fe_gate_ready(fe_gate *g)
+{
+    return (dma_count(g->hw, g->gate_chan) == 0);
+}
+
+// Count an overflow, called from PWM wrap interrupt
+void fe_gate_wrap_irq(fe_gate *g)
+{
+    g->wraps++;
+}
+
+// Get number of counter overflows
+uint32_t fe_gate_wraps(fe_gate *g)
+{
+    if (g->wrap_chan != FE_NO_CHAN)
+        return (FE_DMA_COUNT_MAX - dma_count(g->hw, g->wrap_chan));
+    return (g->wraps);
+}
+
+// Stop gate timer, and get counter value
+uint32_t fe_gate_value(fe_gate *g)
+{
+    *g->hw->pwm_en &= ~(1u << g->gate_slice);
+    return (fe_count_total(pwm_slice(g->hw, g->counter_slice)[PWM_CTR], fe_gate_wraps(g)));
+}
+
+// Get total count, given 16-bit counter value and number of overflows
+uint32_t fe_count_total(uint32_t ctr, uint32_t wraps)
+{
+    return ((uint16_t)ctr + wraps * FE_COUNTER_WRAP);
+}
+
+// Initialise edge timer; DMA must be configured to copy timer on counter wrap
+void fe_edge_init(fe_edge *e, const fe_hw *hw, int counter_slice, int timer_chan)
+{
+    e->hw = hw;
+    e->counter_slice = counter_slice;
+    e->timer_chan = timer_chan;
+    e->times = 0;
+    e->ntimes = 0;
+}
+
+// Start DMA to record edge times
+void fe_edge_start(fe_edge *e, uint32_t *times, int ntimes)
+{
+    const fe_hw *hw = e->hw;
+    volatile uint32_t *slice = pwm_slice(hw, e->counter_slice);
+
+    e->times = times;
+    e->ntimes = ntimes;
+    dma_abort(hw, e->timer_chan);
+    dma_chan(hw, e->timer_chan)[DMA_WRITE_ADDR] = (uint32_t)(uintptr_t)times;
+    dma_start(hw, e->timer_chan, ntimes);
+    slice[PWM_CTR] = 0;
+    slice[PWM_CSR] |= PWM_CSR_EN;
+}
+
+// Get number of edge times recorded
+int fe_edge_count(fe_edge *e)
+{
+    return (e->ntimes - (int)dma_count(e->hw, e->timer_chan));
+}
+
+// Stop recording edge times
+void fe_edge_stop(fe_edge *e)
+{
+    dma_abort(e->hw, e->timer_chan);
+    pwm_slice(e->hw, e->counter_slice)[PWM_CSR] &= ~PWM_CSR_EN;
+}
+
+// Get total of the intervals between edge times, stopping at first zero time
+uint32_t fe_edge_total(const uint32_t *times, int ntimes, int *nintervals)
+{
+    uint32_t total = 0;
+    int i = 1;
+
+    while (i < ntimes && times[i])
+    {
+        total += times[i] - times[i-1];
+        i++;
+    }
+    *nintervals = i > 1 ? i - 1 : 0;
+    return (total);
+}
+
+// EOF
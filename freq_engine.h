@@ -0,0 +1,60 @@
+// Frequency measurement engine for Pi Pico RP2040 or RP2350
+// Shared by picofreq.c firmware, and picofreq_native MicroPython module
+//
+// Copyright (c) Jeremy P Bentham 2023
+
+// v0.01 agent 19/10/26 Adapted from picofreq.c v0.02
+
+#ifndef FREQ_ENGINE_H
+#define FREQ_ENGINE_H
+
+#include <stdint.h>
+#include <stdbool.h>
+
+#define FE_COUNTER_WRAP     0x10000     // Counts per PWM counter wraparound
+#define FE_DMA_COUNT_MAX    0xfffffff   // Max DMA transfer count
+#define FE_NO_CHAN          (-1)        // No DMA channel (use IRQ instead)
+
+// Register addresses, so engine can be used without the Pico SDK
+typedef struct {
+    volatile uint32_t *pwm_base;    // PWM slice 0 CSR
+    volatile uint32_t *pwm_en;      // PWM enable register
+    volatile uint32_t *dma_base;    // DMA channel 0 read address
+    volatile uint32_t *dma_abort;   // DMA abort register
+} fe_hw;
+
+// Gated edge-counter: DMA from gate timer stops the counter
+// Counter overflows are counted by PWM wrap IRQ, or DMA on PWM wrap
+typedef struct {
+    const fe_hw *hw;
+    int counter_slice, gate_slice;
+    int gate_chan, wrap_chan;
+    uint32_t csr_stopval;
+    volatile uint32_t wraps;
+} fe_gate;
+
+// Edge-timer: DMA copies the microsecond timer on every edge
+typedef struct {
+    const fe_hw *hw;
+    int counter_slice, timer_chan;
+    uint32_t *times;
+    int ntimes;
+} fe_edge;
+
+void fe_gate_init(fe_gate *g, const fe_hw *hw, int counter_slice, int gate_slice,
+                  int gate_chan, int wrap_chan);
+void fe_gate_start(fe_gate *g);
+bool fe_gate_ready(fe_gate *g);
+void fe_gate_wrap_irq(fe_gate *g);
+uint32_t fe_gate_wraps(fe_gate *g);
+uint32_t fe_gate_value(fe_gate *g);
+uint32_t fe_count_total(uint32_t ctr, uint32_t wraps);
+void fe_edge_init(fe_edge *e, const fe_hw *hw, int counter_slice, int timer_chan);
+void fe_edge_start(fe_edge *e, uint32_t *times, int ntimes);
+int fe_edge_count(fe_edge *e);
+void fe_edge_stop(fe_edge *e);
+uint32_t fe_edge_total(const uint32_t *times, int ntimes, int *nintervals);
+
+#endif
+
+// EOF
@@ -0,0 +1,144 @@
+// MicroPython native module for frequency measurement on Pi Pico
+// Provides the freq_engine.c gate counter and edge timer to Python
+//
+// Copyright (c) PicoFreq contributors 2026
+
+// v0.01 agent 19/10/26 First version
+
+#include "py/dynruntime.h"
+
+// Native modules can't install interrupt handlers, so counter
+// overflows are counted by a DMA channel triggered on PWM wrap
+#include "freq_engine.c"
+
+static fe_hw freq_hw;
+static fe_gate freq_gate;
+static fe_edge freq_edge;
+
+// Set register addresses: PWM base, PWM enable, DMA base, DMA abort
+static mp_obj_t hw_init(size_t n_args, const mp_obj_t *args)
+{
+    freq_hw.pwm_base = (volatile uint32_t *)mp_obj_get_int_truncated(args[0]);
+    freq_hw.pwm_en = (volatile uint32_t *)mp_obj_get_int_truncated(args[1]);
+    freq_hw.dma_base = (volatile uint32_t *)mp_obj_get_int_truncated(args[2]);
+    freq_hw.dma_abort = (volatile uint32_t *)mp_obj_get_int_truncated(args[3]);
+    return mp_const_none;
+}
+static MP_DEFINE_CONST_FUN_OBJ_VAR_BETWEEN(hw_init_obj, 4, 4, hw_init);
+
+// Initialise gated counter: counter & gate slices, gate & wrap DMA channels
+static mp_obj_t gate_init(size_t n_args, const mp_obj_t *args)
+{
+    fe_gate_init(&freq_gate, &freq_hw, mp_obj_get_int(args[0]), mp_obj_get_int(args[1]),
+                 mp_obj_get_int(args[2]), mp_obj_get_int(args[3]));
+    return mp_const_none;
+}
+static MP_DEFINE_CONST_FUN_OBJ_VAR_BETWEEN(gate_init_obj, 4, 4, gate_init);
+
+// Start gated counter
+static mp_obj_t gate_start(void)
+{
+    fe_gate_start(&freq_gate);
+    return mp_const_none;
+}
+static MP_DEFINE_CONST_FUN_OBJ_0(gate_start_obj, gate_start);
+
+// Check if gate time is complete
+static mp_obj_t gate_ready(void)
+{
+    return fe_gate_ready(&freq_gate) ? mp_const_true : mp_const_false;
+}
+static MP_DEFINE_CONST_FUN_OBJ_0(gate_ready_obj, gate_ready);
+
+// Get number of counter overflows
+static mp_obj_t gate_wraps(void)
+{
+    return mp_obj_new_int_from_uint(fe_gate_wraps(&freq_gate));
+}
+static MP_DEFINE_CONST_FUN_OBJ_0(gate_wraps_obj, gate_wraps);
+
+// Stop gate timer, and get counter value
+static mp_obj_t gate_value(void)
+{
+    return mp_obj_new_int_from_uint(fe_gate_value(&freq_gate));
+}
+static MP_DEFINE_CONST_FUN_OBJ_0(gate_value_obj, gate_value);
+
+// Get total count, given 16-bit counter value and number of overflows
+static mp_obj_t count_total(mp_obj_t ctr, mp_obj_t wraps)
+{
+    return mp_obj_new_int_from_uint(fe_count_total(mp_obj_get_int_truncated(ctr),
+                                                   mp_obj_get_int_truncated(wraps)));
+}
+static MP_DEFINE_CONST_FUN_OBJ_2(count_total_obj, count_total);
+
+// Initialise edge timer: counter slice, timer DMA channel
+static mp_obj_t edge_init(mp_obj_t slice, mp_obj_t chan)
+{
+    fe_edge_init(&freq_edge, &freq_hw, mp_obj_get_int(slice), mp_obj_get_int(chan));
+    return mp_const_none;
+}
+static MP_DEFINE_CONST_FUN_OBJ_2(edge_init_obj, edge_init);
+
+// Start recording edge times into 32-bit array
+static mp_obj_t edge_start(mp_obj_t buff)
+{
+    mp_buffer_info_t info;
+    mp_get_buffer_raise(buff, &info, MP_BUFFER_WRITE);
+    fe_edge_start(&freq_edge, (uint32_t *)info.buf, info.len / sizeof(uint32_t));
+    return mp_const_none;
+}
+static MP_DEFINE_CONST_FUN_OBJ_1(edge_start_obj, edge_start);
+
+// Get number of edge times recorded
+static mp_obj_t edge_count(void)
+{
+    return mp_obj_new_int(fe_edge_count(&freq_edge));
+}
+static MP_DEFINE_CONST_FUN_OBJ_0(edge_count_obj, edge_count);
+
+// Stop recording edge times
+static mp_obj_t edge_stop(void)
+{
+    fe_edge_stop(&freq_edge);
+    return mp_const_none;
+}
+static MP_DEFINE_CONST_FUN_OBJ_0(edge_stop_obj, edge_stop);
+
+// Get total of intervals between edge times, and number of intervals
+static mp_obj_t edge_total(mp_obj_t buff, mp_obj_t count)
+{
+    mp_buffer_info_t info;
+    int n, ntimes = mp_obj_get_int(count);
+    mp_get_buffer_raise(buff, &info, MP_BUFFER_READ);
+    if (ntimes > (int)(info.len / sizeof(uint32_t)))
+        ntimes = info.len / sizeof(uint32_t);
+    uint32_t total = fe_edge_total((const uint32_t *)info.buf, ntimes, &n);
+    mp_obj_t items[2] = {mp_obj_new_int_from_uint(total), mp_obj_new_int(n)};
+    return mp_obj_new_tuple(2, items);
+}
+static MP_DEFINE_CONST_FUN_OBJ_2(edge_total_obj, edge_total);
+
+// Module entry point
+mp_obj_t mpy_init(mp_obj_fun_bc_t *self, size_t n_args, size_t n_kw, mp_obj_t *args)
+{
+    MP_DYNRUNTIME_INIT_ENTRY
+
+    mp_store_global(MP_QSTR_hw_init, MP_OBJ_FROM_PTR(&hw_init_obj));
+    mp_store_global(MP_QSTR_gate_init, MP_OBJ_FROM_PTR(&gate_init_obj));
+    mp_store_global(MP_QSTR_gate_start, MP_OBJ_FROM_PTR(&gate_start_obj));
+    mp_store_global(MP_QSTR_gate_ready, MP_OBJ_FROM_PTR(&gate_ready_obj));
+    mp_store_global(MP_QSTR_gate_wraps, MP_OBJ_FROM_PTR(&gate_wraps_obj));
+    mp_store_global(MP_QSTR_gate_value, MP_OBJ_FROM_PTR(&gate_value_obj));
+    mp_store_global(MP_QSTR_count_total, MP_OBJ_FROM_PTR(&count_total_obj));
+    mp_store_global(MP_QSTR_edge_init, MP_OBJ_FROM_PTR(&edge_init_obj));
+    mp_store_global(MP_QSTR_edge_start, MP_OBJ_FROM_PTR(&edge_start_obj));
+    mp_store_global(MP_QSTR_edge_count, MP_OBJ_FROM_PTR(&edge_count_obj));
+    mp_store_global(MP_QSTR_edge_stop, MP_OBJ_FROM_PTR(&edge_stop_obj));
+    mp_store_global(MP_QSTR_edge_total, MP_OBJ_FROM_PTR(&edge_total_obj));
+    mp_store_global(MP_QSTR_NO_CHAN, MP_OBJ_NEW_SMALL_INT(FE_NO_CHAN));
+
+    MP_DYNRUNTIME_INIT_EXIT
+}
+
+// EOF
@@ -0,0 +1,213 @@
+# Pico MicroPython: frequency measurement of analog signals using ADC & DMA
+#
+# Copyright (c) 2021 Jeremy P Bentham
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# v0.01 agent 19/10/26 Adapted from pico_timer.py
+# v0.02 agent 19/10/26 Hysteresis from signal level, corrected ADC pin setup
+# v0.03 agent 19/10/26 Clamp sample rate to ADC divisor range
+
+import time, micropython, pico_devices as devs
+
+PWM_OUT_PIN, ADC_IN_PIN = 4, 26
+
+# Output signal for testing: connect to ADC input through RC low-pass filter
+PWM_DIV = int(devs.CLOCK_NOMINAL/1e6)  # 1 MHz
+PWM_WRAP = 999                      # 1 MHz / (999 + 1) = 1 kHz
+PWM_LEVEL = (PWM_WRAP+1)//2         # 50% PWM
+
+ADC_SAMPLE_RATE = 100e3          # Sample rate, 500 ksps maximum
+ADC_DIV_MAX = 0xffffff           # Max ADC divisor (16-bit integer, 8-bit fraction)
+ADC_HYST_FRACTION = 0.25         # Zero-crossing hysteresis, fraction of peak-to-peak
+ADC_MIN_PP = 8                   # Min peak-to-peak signal (ADC units)
+NSAMPLES = 4096                  # Number of ADC samples
+adc_data = devs.array16(NSAMPLES)   # ADC sample data
+stats_data = devs.array32(3)        # Total, min & max of samples
+crossing_data = devs.array32(3)     # Count, first & last zero-crossing
+
+# Start a PWM output
+def pwm_out(pin, div, level, wrap):
+    devs.gpio_set_function(pin, devs.GPIO_FUNC_PWM)
+    pwm = devs.PWM(pin)
+    pwm.set_clkdiv_int_frac(div, 0)
+    pwm.set_wrap(wrap)
+    pwm.set_chan_level(pwm.gpio_to_channel(pin), level)
+    pwm.set_enabled(1)
+    return pwm
+
+# Initialise ADC input pin (digital input disabled)
+# Return ADC channel, or None if pin isn't an ADC input
+def adc_pin_init(pin):
+    chan = pin - devs.ADC_PIN_BASE
+    if chan < 0 or chan >= devs.ADC_PIN_COUNT:
+        print("Error: ADC input must be GPIO %u to %u" %
+              (devs.ADC_PIN_BASE, devs.ADC_PIN_BASE+devs.ADC_PIN_COUNT-1))
+        return None
+    devs.gpio_set_function(pin, devs.GPIO_FUNC_NULL)
+    devs.PAD_PINS[pin].PAD.IE = 0
+    devs.PAD_PINS[pin].PAD.PUE = devs.PAD_PINS[pin].PAD.PDE = 0
+    devs.PAD_PINS[pin].PAD.OD = 1
+    return chan
+
+# Initialise ADC for free-running conversions at given rate
+# Rate is limited to the ADC range, about 732 sps to 500 ksps
+def adc_init(chan, rate):
+    adc = devs.ADC_DEVICE
+    adc.CS_REG = adc.FCS_REG = 0
+    adc.CS.EN = 1
+    adc.CS.AINSEL = chan
+    min_rate = devs.ADC_CLOCK_FREQ / (1 + ADC_DIV_MAX / 256.0)
+    max_rate = devs.ADC_CLOCK_FREQ / devs.ADC_MIN_CYCLES
+    if not min_rate <= rate <= max_rate:
+        print("Error: ADC sample rate out of range, using nearest")
+        rate = min(max(rate, min_rate), max_rate)
+    div = devs.ADC_CLOCK_FREQ / rate - 1
+    adc.DIV_REG = min(int(div * 256), ADC_DIV_MAX)
+    adc.FCS.EN = adc.FCS.DREQ_EN = 1
+    adc.FCS.THRESH = 1
+    return adc
+
+# Get actual ADC sample rate
+def adc_sample_rate(adc):
+    cycles = 1 + adc.DIV_REG / 256.0
+    return devs.ADC_CLOCK_FREQ / max(cycles, devs.ADC_MIN_CYCLES)
+
+# Discard any samples in the ADC FIFO
+def adc_fifo_drain(adc):
+    while not adc.FCS.EMPTY:
+        adc.FIFO_REG
+
+# Initialise ADC DMA
+def adc_dma_init(adc):
+    dma = devs.DMA()
+    dma.set_transfer_data_size(devs.DMA_SIZE_16)
+    dma.set_read_increment(False)
+    dma.set_write_increment(True)
+    dma.set_dreq(devs.DREQ_ADC)
+    dma.set_read_addr(devs.ADC_FIFO_ADDR)
+    return dma
+
+# Start ADC sampling into buffer
+def adc_capture_start(adc, dma, buff):
+    adc.CS.START_MANY = 0
+    adc_fifo_drain(adc)
+    dma.abort()
+    dma.set_write_addr(devs.addressof(buff))
+    dma.set_trans_count(len(buff), True)
+    adc.CS.START_MANY = 1
+
+# Check if ADC capture is complete
+def adc_capture_complete(dma):
+    return dma.get_trans_count() == 0
+
+# Stop ADC sampling
+def adc_capture_stop(adc, dma):
+    adc.CS.START_MANY = 0
+    dma.abort()
+    adc_fifo_drain(adc)
+
+# Get total, minimum & maximum of ADC samples, return total
+@micropython.viper
+def adc_stats(buff: ptr16, n: int, res: ptr32) -> int:
+    total = 0
+    lo = 0xffff
+    hi = 0
+    i = 0
+    while i < n:
+        val = buff[i]
+        total += val
+        if val < lo:
+            lo = val
+        if val > hi:
+            hi = val
+        i += 1
+    res[0] = total
+    res[1] = lo
+    res[2] = hi
+    return total
+
+# Find rising zero-crossings through the given level, with hysteresis
+# Results are crossing count, and sample index after first & last crossing
+@micropython.viper
+def adc_crossings(buff: ptr16, n: int, level: int, hyst: int, res: ptr32) -> int:
+    count = 0
+    first = 0
+    last = 0
+    armed = 0
+    lo = level - hyst
+    i = 0
+    while i < n:
+        val = buff[i]
+        if val < lo:
+            armed = 1
+        elif armed and val >= level and i > 0:
+            if count == 0:
+                first = i
+            last = i
+            count += 1
+            armed = 0
+        i += 1
+    res[0] = count
+    res[1] = first
+    res[2] = last
+    return count
+
+# Get interpolated position of crossing, between sample before & after
+def crossing_position(buff, idx, level):
+    v0, v1 = buff[idx-1], buff[idx]
+    return idx - 1 + ((level - v0) / (v1 - v0) if v1 != v0 else 1.0)
+
+# Get frequency from ADC samples, using interpolated zero-crossings
+# Hysteresis defaults to a fraction of the peak-to-peak signal
+# Returns 0 if signal is below ADC_MIN_PP, or has too few crossings
+def adc_frequency(buff, rate, n=None, hyst=None):
+    n = len(buff) if n is None else n
+    if n < 2:
+        return 0
+    level = adc_stats(buff, n, stats_data) // n
+    pp = stats_data[2] - stats_data[1]
+    if pp < ADC_MIN_PP:
+        return 0
+    if hyst is None:
+        hyst = max(1, int(pp * ADC_HYST_FRACTION))
+    count = adc_crossings(buff, n, level, hyst, crossing_data)
+    if count < 2:
+        return 0
+    t1 = crossing_position(buff, crossing_data[1], level)
+    t2 = crossing_position(buff, crossing_data[2], level)
+    return rate * (count - 1) / (t2 - t1) if t2 > t1 else 0
+
+if __name__ == "__main__":
+    print("PWM output pin %u, ADC input pin %u" % (PWM_OUT_PIN, ADC_IN_PIN))
+    test_signal = pwm_out(PWM_OUT_PIN, PWM_DIV, PWM_LEVEL, PWM_WRAP)
+
+    adc_chan = adc_pin_init(ADC_IN_PIN)
+    if adc_chan is None:
+        raise SystemExit
+    adc = adc_init(adc_chan, ADC_SAMPLE_RATE)
+    adc_dma = adc_dma_init(adc)
+    rate = adc_sample_rate(adc)
+
+    adc_capture_start(adc, adc_dma, adc_data)
+    time.sleep(NSAMPLES / rate + 0.01)
+    if not adc_capture_complete(adc_dma):
+        print("ADC DMA failed")
+    count = NSAMPLES - adc_dma.get_trans_count()
+    adc_capture_stop(adc, adc_dma)
+    freq = adc_frequency(adc_data, rate, count)
+    pp = stats_data[2] - stats_data[1]
+    print("%u samples at %3.1f ksps, peak-to-peak %u, freq %5.3f Hz%s" % (count,
+          rate/1000.0, pp, freq, " (signal too small)" if pp < ADC_MIN_PP else ""))
+
+# EOF
@@ -21,12 +21,13 @@
 # v0.03 JPB 19/8/23 Renamed rp_pwm_counter.py to pico_counter.py
 # v0.04 JPB 20/8/23 Switched input from pin 7 to pin 3
 # v0.05 JPB 15/10/24 Adapted to work with RP2040 and RP2350
+# v0.06 agent 19/10/26 Use nominal clock for test signal divisor
 
 import time, pico_devices as devs
 
 PWM_OUT_PIN, PWM_IN_PIN = 4, 3
 
-PWM_DIV = int(devs.CLOCK_FREQ/1e6)  # 1 MHz
+PWM_DIV = int(devs.CLOCK_NOMINAL/1e6)  # 1 MHz
 PWM_WRAP = 9                        # 1 MHz / (9 + 1) = 100 kHz
 PWM_LEVEL = (PWM_WRAP+1)//2         # 50% PWM
 
@@ -22,9 +22,16 @@
 # v0.05 JPB 21/8/23  Tidied up for release
 # v0.06 JPB 31/10/23 Corrected PAD_PINS definition (added offset)
 # v0.07 JPB 14/10/24 Added Pico 2 (RP2350) definitions
+# v0.08 agent 19/10/26 Added ADC clock, ADC input pins and 16-bit array
+# v0.09 agent 19/10/26 Added calibrated clock frequency
+# v0.10 agent 19/10/26 Added DMA abort address, for native module
+# v0.11 agent 19/10/26 Added DMA pacing timers
+# v0.12 agent 19/10/26 Added DMA count & PWM counter addresses
+# v0.13 agent 19/10/26 Clock calibration is an offset, and can be set at runtime
+# v0.14 agent 19/10/26 PWM uses current clock frequency, unless one is given
 
 from uctypes import BF_POS, BF_LEN, UINT32, BFUINT32, struct
-import array, uctypes, uos
+import array, json, uctypes, uos
 
 PICO2 = "2350" in uos.uname().machine
 if PICO2:
@@ -44,6 +51,41 @@ else:
     TIMER_BASE      = 0x40054000
     DMA_BASE        = 0x50000000
 
+# Clock calibration: offset (Hz) of actual system clock, measured against 1PPS
+# Kept as an offset, since floats are single-precision (8 Hz steps at 125 MHz)
+CLOCK_NOMINAL = CLOCK_FREQ
+CLOCK_CAL_FILE = "clock_cal.json"
+
+# Load clock calibration, return None if unavailable
+def clock_cal_load(fname=CLOCK_CAL_FILE):
+    try:
+        with open(fname) as f:
+            cal = json.load(f)
+        if cal.get("nominal") == CLOCK_NOMINAL and "offset" in cal:
+            return cal
+    except (OSError, ValueError):
+        pass
+    return None
+
+# Save clock calibration
+def clock_cal_save(offset, fname=CLOCK_CAL_FILE):
+    with open(fname, "w") as f:
+        json.dump({"nominal": CLOCK_NOMINAL, "offset": offset}, f)
+
+# Set clock offset, and the clock frequencies that depend on it
+# Timer and ADC clocks use the same crystal, so have the same scaling
+# Use devs.CLOCK_FREQ etc. when needed; copies taken at import aren't updated
+def clock_cal_set(offset):
+    global CLOCK_OFFSET, CLOCK_FREQ, CLOCK_SCALE, TIMER_FREQ, ADC_CLOCK_FREQ
+    CLOCK_OFFSET = offset
+    CLOCK_SCALE = 1.0 + offset / CLOCK_NOMINAL
+    CLOCK_FREQ = CLOCK_NOMINAL * CLOCK_SCALE
+    TIMER_FREQ = 1e6 * CLOCK_SCALE
+    ADC_CLOCK_FREQ = 48e6 * CLOCK_SCALE     # ADC clock from USB PLL
+
+CLOCK_CAL = clock_cal_load()
+clock_cal_set(CLOCK_CAL["offset"] if CLOCK_CAL else 0.0)
+
 # DMA: datasheet RP2040 2.5.7, RP2350 12.6.10
 DMA_CHAN_WIDTH  = 0x40
 DMA_CHAN_COUNT  = 16
@@ -60,6 +102,8 @@ else:
   DREQ_UART0_TX, DREQ_UART0_RX, DREQ_UART1_TX, DREQ_UART1_RX = 20, 21, 22, 23
   DREQ_PWM_WRAP0,DREQ_PWM_WRAP1,DREQ_PWM_WRAP2,DREQ_PWM_WRAP3= 24, 25, 26, 27
   DREQ_ADC                                                   = 36
+DREQ_DMA_TIMER0, DREQ_DMA_TIMER1, DREQ_DMA_TIMER2, DREQ_DMA_TIMER3 = 59, 60, 61, 62
+DMA_TIMER_COUNT = 4
 
 if PICO2:
   DMA_CTRL_TRIG_FIELDS = {
@@ -156,6 +200,7 @@ else:
   }
 DMA_CHANS = [struct(DMA_BASE + n*DMA_CHAN_WIDTH, DMA_CHAN_REGS) for n in range(0,DMA_CHAN_COUNT)]
 DMA_DEVICE = struct(DMA_BASE, DMA_DEVICE_REGS)
+DMA_ABORT_ADDR = DMA_BASE + (0x464 if PICO2 else 0x444)
 
 # GPIO status and control: datasheet RP2040 2.19.6.1, RP2350 9.11.1
 GPIO_CHAN_WIDTH = 0x08
@@ -245,6 +290,9 @@ ADC_DEVICE_REGS = {
 }
 ADC_DEVICE = struct(ADC_BASE, ADC_DEVICE_REGS)
 ADC_FIFO_ADDR = ADC_BASE + 0x0c
+ADC_MIN_CYCLES  = 96        # Clock cycles per conversion (500 ksps max)
+ADC_PIN_BASE    = 26        # GPIO pin for ADC input 0
+ADC_PIN_COUNT   = 4
 
 # PWM: datasheet RP2040 4.5.3 RP2350 12.5.3
 PWM_SLICE_WIDTH = 0x14
@@ -306,6 +354,14 @@ def addressof(var):
 def array32(size):
     return array.array('I', (0 for _ in range(size)))
 
+# Create 16-bit array (to receive ADC DMA data)
+def array16(size):
+    return array.array('H', (0 for _ in range(size)))
+
+# Set DMA pacing timer: rate is sysclk * x / y (x and y are 16-bit)
+def dma_timer_set(timer, x, y):
+    setattr(DMA_DEVICE, "TIMER%u" % timer, (x << 16) | y)
+
 # Class for RP2040/2350 DMA
 class DMA:
     instance_number = 0
@@ -363,6 +419,9 @@ class DMA:
     # Return number of transfers that remain        
     def get_trans_count(self):
         return self.chan.TRANS_COUNT_REG & 0xfffffff
+    # Return address of transfer count register, to be read by DMA
+    def get_trans_count_address(self):
+        return DMA_BASE + self.chan_number*DMA_CHAN_WIDTH + 0x08
     # Print register values
     def print_regs(self):
         print("READ_ADDR  %08X, "      % self.chan.READ_ADDR_REG, end="")
@@ -372,7 +431,7 @@ class DMA:
         
 # Class for RP2040/2350 PWM
 class PWM:
-    def __init__(self, gpio, clock=CLOCK_FREQ):
+    def __init__(self, gpio, clock=None):
         self.gpio = gpio
         self.clock = clock
         self.slice_num = self.gpio_to_slice_num(gpio)
@@ -427,13 +486,17 @@ class PWM:
     # Calculate current PWM output frequency
     def get_output_frequency(self):
         div = float(self.slice.DIV.INT) + self.slice.DIV.FRAC / 16.0
-        return self.clock / (div * (self.slice.TOP_REG + 1))
+        clock = self.clock or CLOCK_FREQ
+        return clock / (div * (self.slice.TOP_REG + 1))
     # Return a data-request signal for this slice
     def get_dreq(self):
         return DREQ_PWM_WRAP0 + self.slice_num
     # Return address of CSR register, to be used by DMA
     def get_csr_address(self):
         return PWM_BASE + self.slice_num*PWM_SLICE_WIDTH
+    # Return address of counter register, to be read by DMA
+    def get_counter_address(self):
+        return self.get_csr_address() + 0x08
     # Print register values
     def print_regs(self):
         print("CSR %08X, " % self.slice.CSR_REG, end="")
@@ -20,6 +20,8 @@
 # v0.04 JPB 20/8/23 Switched input from pin 7 to pin 3
 # v0.05 JPB 20/8/23 Corrected DMA initialisation
 # v0.06 JPB 15/10/24 Adapted to work with RP2040 and RP2350
+# v0.07 agent 19/10/26 Gate time uses saved clock calibration
+# v0.08 agent 19/10/26 Gate time uses current clock calibration, when measured
 
 import time, pico_devices as devs
 
@@ -27,7 +29,7 @@ PWM_OUT_PIN, PWM_IN_PIN = 4, 3
 GATE_TIMER_PIN          = 0
 
 # Output signal for testing
-PWM_DIV = int(devs.CLOCK_FREQ/1e6)  # 1 MHz
+PWM_DIV = int(devs.CLOCK_NOMINAL/1e6)  # 1 MHz
 PWM_WRAP = 9                        # 1 MHz / (9 + 1) = 100 kHz
 PWM_LEVEL = (PWM_WRAP+1)//2         # 50% PWM
     
@@ -39,8 +41,6 @@ if devs.PICO2:
 else:
     GATE_PRESCALE = 250     # 125e6 / 250 = 500 kHz
     GATE_WRAP = 125000      # 500 kHz / 125000 = 4 Hz (250 ms)
-GATE_FREQ = devs.CLOCK_FREQ / (GATE_PRESCALE * GATE_WRAP)
-GATE_TIME_MSEC = 1000 / GATE_FREQ
 
 gate_data = devs.array32(1) # Gate DMA data
 
@@ -104,6 +104,10 @@ def dma_complete(dma):
 def freq_gate_stop(ctr, gate, dma):
     gate_pwm.set_enabled(False)
     dma.abort()
+
+# Get gate time, using current (calibrated) clock frequency
+def gate_time_msec():
+    return 1000.0 * GATE_PRESCALE * GATE_WRAP / devs.CLOCK_FREQ
     
 if __name__ == "__main__":
     print("PWM output pin %u, freq input pin %u" % (PWM_OUT_PIN, PWM_IN_PIN))
@@ -119,6 +123,7 @@ if __name__ == "__main__":
         print("Gate DMA failed")
     count = pulse_counter_value(counter_pwm)
     freq_gate_stop(counter_pwm, gate_pwm, gate_dma)
-    freq = count / GATE_TIME_MSEC
-    print("Gate %3.1f ms, count %u, freq %3.1f kHz" % (GATE_TIME_MSEC, count, freq))
+    gate_msec = gate_time_msec()
+    freq = count / gate_msec
+    print("Gate %3.1f ms, count %u, freq %3.1f kHz" % (gate_msec, count, freq))
 # EOF
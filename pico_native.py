@@ -0,0 +1,135 @@
+# Pico MicroPython: frequency measurement using the native C engine
+#
+# Copyright (c) 2021 Jeremy P Bentham
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# v0.01 agent 19/10/26 Adapted from pico_freq.py and pico_timer.py
+# v0.02 agent 19/10/26 Stop overflow DMA before reusing counter as edge timer
+# v0.03 agent 19/10/26 Gate time uses current clock calibration
+#
+# Requires picofreq_native.mpy, built from natmod directory
+
+import time, pico_devices as devs, picofreq_native as native
+
+PWM_OUT_PIN, PWM_IN_PIN = 4, 3
+GATE_TIMER_PIN          = 0
+
+# Output signal for testing
+PWM_DIV = int(devs.CLOCK_NOMINAL/1e6)   # 1 MHz
+PWM_WRAP = 9                            # 1 MHz / (9 + 1) = 100 kHz
+PWM_LEVEL = (PWM_WRAP+1)//2             # 50% PWM
+
+# Frequency gate settings, as pico_freq.py
+GATE_PRESCALE = 250
+GATE_WRAP = 120000 if devs.PICO2 else 125000
+
+NTIMES = 11                     # Number of edge times
+time_data = devs.array32(NTIMES)
+wrap_data = devs.array32(1)     # Dummy array for overflow DMA
+
+# Start a PWM output
+def pwm_out(pin, div, level, wrap):
+    devs.gpio_set_function(pin, devs.GPIO_FUNC_PWM)
+    pwm = devs.PWM(pin)
+    pwm.set_clkdiv_int_frac(div, 0)
+    pwm.set_wrap(wrap)
+    pwm.set_chan_level(pwm.gpio_to_channel(pin), level)
+    pwm.set_enabled(1)
+    return pwm
+
+# Give register addresses to native module
+def native_init():
+    native.hw_init(devs.PWM_BASE, devs.PWM_EN_REG_ADDR, devs.DMA_BASE, devs.DMA_ABORT_ADDR)
+
+# Initialise PWM as a pulse counter (gpio must be odd number)
+def pulse_counter_init(pin, rising=True):
+    if pin & 1 == 0:
+        print("Error: pulse counter must be odd GPIO pin")
+    devs.gpio_set_function(pin, devs.GPIO_FUNC_PWM)
+    ctr = devs.PWM(pin)
+    ctr.set_clkdiv_mode(devs.PWM_DIV_B_RISING if rising else devs.PWM_DIV_B_FALLING)
+    ctr.set_clkdiv(1)
+    return ctr
+
+# Initialise PWM as a gate timer
+def gate_timer_init(pin):
+    pwm = devs.PWM(pin)
+    pwm.set_clkdiv_int_frac(GATE_PRESCALE, 0)
+    pwm.set_wrap(int(GATE_WRAP/2 - 1))
+    pwm.set_chan_level(pwm.gpio_to_channel(pin), int(GATE_WRAP/4))
+    pwm.set_phase_correct(True)
+    return pwm
+
+# Get gate time, using current (calibrated) clock frequency
+def gate_time_msec():
+    return 1000.0 * GATE_PRESCALE * GATE_WRAP / devs.CLOCK_FREQ
+
+# Initialise DMA channels for gated counter, and pass them to native module
+# One channel stops the counter, the other counts counter overflows
+def freq_gate_init(ctr, gate):
+    gate_dma = devs.DMA()
+    gate_dma.set_transfer_data_size(devs.DMA_SIZE_32)
+    gate_dma.set_read_increment(False)
+    gate_dma.set_write_increment(False)
+    gate_dma.set_dreq(gate.get_dreq())
+    wrap_dma = devs.DMA()
+    wrap_dma.set_transfer_data_size(devs.DMA_SIZE_8)
+    wrap_dma.set_read_increment(False)
+    wrap_dma.set_write_increment(False)
+    wrap_dma.set_read_addr(devs.addressof(wrap_data))
+    wrap_dma.set_write_addr(devs.addressof(wrap_data))
+    wrap_dma.set_dreq(ctr.get_dreq())
+    native.gate_init(ctr.slice_num, gate.slice_num, gate_dma.chan_number, wrap_dma.chan_number)
+    return gate_dma, wrap_dma
+
+# Initialise PWM & DMA for edge timer, and pass them to native module
+def edge_timer_init(timer):
+    timer.set_wrap(0)
+    dma = devs.DMA()
+    dma.set_transfer_data_size(devs.DMA_SIZE_32)
+    dma.set_read_increment(False)
+    dma.set_write_increment(True)
+    dma.set_dreq(timer.get_dreq())
+    dma.set_read_addr(devs.TIMER_RAWL_ADDR)
+    native.edge_init(timer.slice_num, dma.chan_number)
+    return dma
+
+if __name__ == "__main__":
+    print("PWM output pin %u, freq input pin %u" % (PWM_OUT_PIN, PWM_IN_PIN))
+    test_signal = pwm_out(PWM_OUT_PIN, PWM_DIV, PWM_LEVEL, PWM_WRAP)
+    native_init()
+
+    counter_pwm = pulse_counter_init(PWM_IN_PIN)
+    gate_pwm = gate_timer_init(GATE_TIMER_PIN)
+    gate_dma, wrap_dma = freq_gate_init(counter_pwm, gate_pwm)
+    native.gate_start()
+    while not native.gate_ready():
+        pass
+    count = native.gate_value()
+    gate_msec = gate_time_msec()
+    freq = count / gate_msec
+    print("Gate %3.1f ms, count %u, freq %3.1f kHz" % (gate_msec, count, freq))
+
+    # Overflow DMA would be triggered by every edge when counter wrap is 0
+    wrap_dma.abort()
+    edge_timer_init(counter_pwm)
+    native.edge_start(time_data)
+    time.sleep(0.01)
+    count = native.edge_count()
+    native.edge_stop()
+    total, n = native.edge_total(time_data, count)
+    freq = (devs.TIMER_FREQ * n / total) if total else 0
+    print("%u edge times, total %u us, freq %3.1f kHz" % (n+1, total, freq/1000))
+
+# EOF
@@ -0,0 +1,215 @@
+# Pico MicroPython: frequency ratio & phase difference of two inputs
+#
+# Copyright (c) 2021 Jeremy P Bentham
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# v0.01 agent 19/10/26 Adapted from pico_timer.py
+# v0.02 agent 19/10/26 Unwrap phase to nearest period, centred drift fit
+# v0.03 agent 19/10/26 Predict phase change over gap between blocks
+
+import time, micropython, pico_devices as devs
+
+REF_OUT_PIN, DUT_OUT_PIN = 4, 8
+REF_IN_PIN, DUT_IN_PIN   = 3, 7
+
+# Output signals for testing, DUT slightly lower than reference
+PWM_DIV = int(devs.CLOCK_NOMINAL/1e6)  # 1 MHz
+REF_WRAP = 999                      # 1 MHz / (999 + 1) = 1 kHz
+DUT_WRAP = 1000                     # 1 MHz / (1000 + 1) = 999 Hz
+
+NTIMES = 256                        # Number of edge times per block
+NBLOCKS = 10                        # Number of blocks to capture
+BLOCK_TIMEOUT_MSEC = 1000           # Max time to capture a block
+TIMER_MASK = 0xffffffff
+ref_data = devs.array32(NTIMES)     # Reference edge times
+dut_data = devs.array32(NTIMES)     # DUT edge times
+pair_data = devs.array32(5)         # Edge-pair results
+
+# Start a PWM output
+def pwm_out(pin, div, level, wrap):
+    devs.gpio_set_function(pin, devs.GPIO_FUNC_PWM)
+    pwm = devs.PWM(pin)
+    pwm.set_clkdiv_int_frac(div, 0)
+    pwm.set_wrap(wrap)
+    pwm.set_chan_level(pwm.gpio_to_channel(pin), level)
+    pwm.set_enabled(1)
+    return pwm
+
+# Initialise PWM as a timer (gpio must be odd number)
+def timer_init(pin, rising=True):
+    if pin & 1 == 0:
+        print("Error: edge timer must be odd GPIO pin")
+    devs.gpio_set_function(pin, devs.GPIO_FUNC_PWM)
+    pwm = devs.PWM(pin)
+    pwm.set_clkdiv_mode(devs.PWM_DIV_B_RISING if rising else devs.PWM_DIV_B_FALLING)
+    pwm.set_clkdiv(1)
+    pwm.set_wrap(0)
+    return pwm
+
+# Initialise timer DMA
+def timer_dma_init(timer):
+    dma = devs.DMA()
+    dma.set_transfer_data_size(devs.DMA_SIZE_32)
+    dma.set_read_increment(False)
+    dma.set_write_increment(True)
+    dma.set_dreq(timer.get_dreq())
+    dma.set_read_addr(devs.TIMER_RAWL_ADDR)
+    return dma
+
+# Start capturing edge times on both inputs at the same time
+def dual_timer_start(timers, dmas, buffs):
+    mask = 0
+    for timer, dma, buff in zip(timers, dmas, buffs):
+        timer.set_enabled(False)
+        timer.set_ctr(0)
+        dma.abort()
+        dma.set_write_addr(devs.addressof(buff))
+        dma.set_trans_count(len(buff), True)
+        mask |= 1 << timer.slice_num
+    timers[0].set_enables(mask, True)
+
+# Stop capturing edge times, return number of times in each buffer
+def dual_timer_stop(timers, dmas, buffs):
+    timers[0].set_enables((1<<timers[0].slice_num) | (1<<timers[1].slice_num), False)
+    counts = [len(buff) - dma.get_trans_count() for dma, buff in zip(dmas, buffs)]
+    for dma in dmas:
+        dma.abort()
+    return counts
+
+# Wait until both buffers are full, or timeout
+def dual_timer_wait(dmas, msec):
+    start = time.ticks_ms()
+    while dmas[0].get_trans_count() or dmas[1].get_trans_count():
+        if time.ticks_diff(time.ticks_ms(), start) > msec:
+            return False
+    return True
+
+# Match each DUT edge with the preceding reference edge
+# Results are pair count, total offset & reference period (phase unwrapped),
+# and time of first & last matched DUT edge
+@micropython.viper
+def edge_pairs(ref: ptr32, nref: int, dut: ptr32, ndut: int, res: ptr32) -> int:
+    count = 0
+    offsets = 0
+    periods = 0
+    first = 0
+    last = 0
+    prev = 0
+    j = 0
+    i = 0
+    while i < ndut:
+        t = dut[i]
+        while j+1 < nref and ref[j+1] - t <= 0:
+            j += 1
+        if j+1 >= nref:
+            break
+        if t - ref[j] >= 0:
+            period = ref[j+1] - ref[j]
+            half = period >> 1
+            offset = t - ref[j]
+            if count == 0:
+                first = t
+            elif period > 0:
+                while offset - prev > half:
+                    offset -= period
+                while prev - offset > half:
+                    offset += period
+            prev = offset
+            last = t
+            offsets += offset
+            periods += period
+            count += 1
+        i += 1
+    res[0] = count
+    res[1] = offsets
+    res[2] = periods
+    res[3] = first
+    res[4] = last
+    return count
+
+# Class to accumulate ratio, phase and phase drift over many blocks
+class PhaseStats:
+    def __init__(self):
+        self.ref_edges = self.ref_usec = self.dut_edges = self.dut_usec = 0
+        self.last_mid = None
+        self.usec = 0
+        self.phase = 0.0
+        self.n = 0
+        self.mean_t = self.mean_p = self.stt = self.stp = 0.0
+    # Add a block of edge times
+    def add_block(self, ref, nref, dut, ndut):
+        if nref < 2 or ndut < 2:
+            return False
+        self.ref_edges += nref - 1
+        self.ref_usec += (ref[nref-1] - ref[0]) & TIMER_MASK
+        self.dut_edges += ndut - 1
+        self.dut_usec += (dut[ndut-1] - dut[0]) & TIMER_MASK
+        if not edge_pairs(ref, nref, dut, ndut, pair_data):
+            return False
+        offsets = pair_data[1] - (1<<32 if pair_data[1] & 0x80000000 else 0)
+        phase = offsets / pair_data[2]
+        mid = (pair_data[3] + ((pair_data[4] - pair_data[3]) & TIMER_MASK) // 2) & TIMER_MASK
+        if self.last_mid is not None:
+            delta = (mid - self.last_mid) & TIMER_MASK
+            self.usec += delta
+            # Edges between blocks aren't captured, so predict the phase change
+            # from the frequency difference, and unwrap to the nearest cycle
+            diff = self.ref_edges * self.dut_usec - self.dut_edges * self.ref_usec
+            pred = self.phase + diff / self.ref_usec * delta / self.dut_usec
+            phase += round(pred - phase)
+        self.last_mid = mid
+        self.phase = phase
+        # Centred (Welford) sums, as floats are single-precision
+        t = self.usec / devs.TIMER_FREQ
+        self.n += 1
+        dt = t - self.mean_t
+        self.mean_t += dt / self.n
+        dp = phase - self.mean_p
+        self.mean_p += dp / self.n
+        self.stt += dt * (t - self.mean_t)
+        self.stp += dt * (phase - self.mean_p)
+        return True
+    # Get DUT / reference frequency ratio
+    def ratio(self):
+        if not self.ref_edges or not self.dut_usec:
+            return 0
+        return (self.dut_edges * self.ref_usec) / (self.ref_edges * self.dut_usec)
+    # Get latest phase difference in degrees (DUT lagging reference)
+    def phase_degrees(self):
+        return (self.phase % 1.0) * 360.0
+    # Get phase drift rate in degrees per second (least-squares fit)
+    def drift_rate(self):
+        return 360.0 * self.stp / self.stt if self.stt else 0
+
+if __name__ == "__main__":
+    print("Reference input pin %u, DUT input pin %u" % (REF_IN_PIN, DUT_IN_PIN))
+    ref_signal = pwm_out(REF_OUT_PIN, PWM_DIV, (REF_WRAP+1)//2, REF_WRAP)
+    dut_signal = pwm_out(DUT_OUT_PIN, PWM_DIV, (DUT_WRAP+1)//2, DUT_WRAP)
+
+    timers = timer_init(REF_IN_PIN), timer_init(DUT_IN_PIN)
+    dmas = timer_dma_init(timers[0]), timer_dma_init(timers[1])
+    buffs = ref_data, dut_data
+    stats = PhaseStats()
+
+    for n in range(NBLOCKS):
+        dual_timer_start(timers, dmas, buffs)
+        if not dual_timer_wait(dmas, BLOCK_TIMEOUT_MSEC):
+            print("Timeout waiting for edges")
+        nref, ndut = dual_timer_stop(timers, dmas, buffs)
+        if stats.add_block(ref_data, nref, dut_data, ndut):
+            print("Block %u: ratio %1.6f, phase %5.1f deg" %
+                  (n, stats.ratio(), stats.phase_degrees()))
+    print("Ratio %1.6f, drift %5.3f deg/s" % (stats.ratio(), stats.drift_rate()))
+
+# EOF
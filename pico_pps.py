@@ -0,0 +1,226 @@
+# Pico MicroPython: 1PPS gated frequency measurement & clock calibration
+#
+# Copyright (c) 2021 Jeremy P Bentham
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# v0.01 agent 19/10/26 Adapted from pico_counter.py and pico_timer.py
+# v0.02 agent 19/10/26 Use DMA & PWM register addresses from pico_devices
+# v0.03 agent 19/10/26 Filter clock offset, to avoid single-precision rounding
+
+import time, pico_devices as devs
+
+PWM_OUT_PIN, PWM_IN_PIN = 4, 3
+PPS_IN_PIN              = 7     # 1PPS input, e.g. from GPS receiver
+SYSCLK_COUNTER_PIN      = 10    # Counts sysclk; pin isn't used
+
+# Output signal for testing
+PWM_DIV = int(devs.CLOCK_NOMINAL/1e6)   # 1 MHz
+PWM_WRAP = 9                            # 1 MHz / (9 + 1) = 100 kHz
+PWM_LEVEL = (PWM_WRAP+1)//2             # 50% PWM
+
+NCAPTURES = 16                  # Number of 1PPS captures per DMA transfer
+NSECS = 60                      # Number of seconds to run
+CAL_MAX_PPM = 200               # Max clock error, to reject bad PPS edges
+CAL_LOCK_SECS = 10              # Seconds to average before first lock
+CAL_GAIN = 1/16.0               # Tracking filter gain, after lock
+CAL_SAVE_SECS = 300             # Interval between saves of calibration
+CLOCK_NOMINAL = int(devs.CLOCK_NOMINAL)
+EXT_COUNT_MAX = 0xfffffff
+TIMER_MASK = 0xffffffff
+
+ext_data = devs.array32(1)              # Dummy array for extended counter
+tick_data = devs.array32(NCAPTURES)     # 1 MHz timer value at each PPS edge
+cycle_data = devs.array32(NCAPTURES)    # sysclk counter at each PPS edge
+count_data = devs.array32(NCAPTURES)    # Extended pulse count at each PPS edge
+
+# Start a PWM output
+def pwm_out(pin, div, level, wrap):
+    devs.gpio_set_function(pin, devs.GPIO_FUNC_PWM)
+    pwm = devs.PWM(pin)
+    pwm.set_clkdiv_int_frac(div, 0)
+    pwm.set_wrap(wrap)
+    pwm.set_chan_level(pwm.gpio_to_channel(pin), level)
+    pwm.set_enabled(1)
+    return pwm
+
+# Initialise PWM to generate a DMA request on every 1PPS edge
+def pps_input_init(pin, rising=True):
+    if pin & 1 == 0:
+        print("Error: PPS input must be odd GPIO pin")
+    devs.gpio_set_function(pin, devs.GPIO_FUNC_PWM)
+    pwm = devs.PWM(pin)
+    pwm.set_clkdiv_mode(devs.PWM_DIV_B_RISING if rising else devs.PWM_DIV_B_FALLING)
+    pwm.set_clkdiv(1)
+    pwm.set_wrap(0)
+    return pwm
+
+# Initialise free-running PWM, to count sysclk cycles
+def sysclk_counter_init(pin):
+    pwm = devs.PWM(pin)
+    pwm.set_clkdiv(1)
+    pwm.set_wrap(0xffff)
+    pwm.set_enabled(True)
+    return pwm
+
+# Initialise PWM as a pulse counter (gpio must be odd number)
+def pulse_counter_init(pin, rising=True):
+    if pin & 1 == 0:
+        print("Error: pulse counter must be odd GPIO pin")
+    devs.gpio_set_function(pin, devs.GPIO_FUNC_PWM)
+    pwm = devs.PWM(pin)
+    pwm.set_clkdiv_mode(devs.PWM_DIV_B_RISING if rising else devs.PWM_DIV_B_FALLING)
+    pwm.set_clkdiv(1)
+    return pwm
+
+# Use DMA to extend pulse counter to 28 bits
+def pulse_counter_ext_init(ctr):
+    ctr.set_enabled(False)
+    ctr.set_wrap(0)
+    ctr.set_ctr(0)
+    dma = devs.DMA()
+    dma.set_transfer_data_size(devs.DMA_SIZE_8)
+    dma.set_read_increment(False)
+    dma.set_write_increment(False)
+    dma.set_read_addr(devs.addressof(ext_data))
+    dma.set_write_addr(devs.addressof(ext_data))
+    dma.set_dreq(ctr.get_dreq())
+    ctr.set_enabled(True)
+    return dma
+
+# Start the extended pulse counter
+def pulse_counter_ext_start(ctr_dma):
+    ctr_dma.abort()
+    ctr_dma.set_trans_count(EXT_COUNT_MAX, True)
+
+# Check if extended pulse counter needs to be restarted
+def pulse_counter_ext_low(ctr_dma):
+    return ctr_dma.get_trans_count() < EXT_COUNT_MAX // 2
+
+# Initialise DMA to copy a value on each 1PPS edge
+def pps_dma_init(pps, addr):
+    dma = devs.DMA()
+    dma.set_transfer_data_size(devs.DMA_SIZE_32)
+    dma.set_read_increment(False)
+    dma.set_write_increment(True)
+    dma.set_dreq(pps.get_dreq())
+    dma.set_read_addr(addr)
+    return dma
+
+# Start capturing values on 1PPS edges
+def pps_capture_start(pps, dmas, buffs):
+    pps.set_enabled(False)
+    for dma, buff in zip(dmas, buffs):
+        dma.abort()
+        dma.set_write_addr(devs.addressof(buff))
+        dma.set_trans_count(len(buff), True)
+    pps.set_ctr(0)
+    pps.set_enabled(True)
+
+# Get number of 1PPS edges captured so far
+def pps_capture_count(dmas):
+    return min(NCAPTURES - dma.get_trans_count() for dma in dmas)
+
+# Get interval between 2 PPS captures of (ticks, cycles, count)
+# Return seconds, sysclk cycles and pulse count
+def pps_interval(cap1, cap2):
+    ticks = (cap2[0] - cap1[0]) & TIMER_MASK
+    secs = round(ticks / devs.TIMER_FREQ)
+    # Coarse cycle count from timer, fine from 16-bit sysclk counter
+    coarse = int(ticks * devs.CLOCK_NOMINAL / 1e6)
+    fine = (cap2[1] - cap1[1]) & 0xffff
+    cycles = coarse + ((fine - coarse + 0x8000) & 0xffff) - 0x8000
+    count = (cap1[2] - cap2[2]) & EXT_COUNT_MAX
+    return secs, cycles, count
+
+# Class to maintain a calibrated sysclk frequency, using 1PPS intervals
+# Floats are single-precision, so the offset from nominal is filtered,
+# using integer cycle counts; the result is used by all modules at runtime
+class ClockCal:
+    def __init__(self):
+        self.locked = devs.CLOCK_CAL is not None
+        self.offset = devs.CLOCK_OFFSET
+        self.total = self.nsecs = 0
+        self.save_ticks = time.ticks_ms()
+    # Add a measurement of cycles in the given number of seconds
+    def update(self, secs, cycles):
+        if secs < 1:
+            return False
+        offset = (cycles - secs * CLOCK_NOMINAL) / secs
+        if abs(offset) > CLOCK_NOMINAL * CAL_MAX_PPM / 1e6:
+            return False
+        if self.locked:
+            self.offset += (offset - self.offset) * CAL_GAIN
+        else:
+            self.total += cycles - secs * CLOCK_NOMINAL
+            self.nsecs += secs
+            if self.nsecs >= CAL_LOCK_SECS:
+                self.offset = self.total / self.nsecs
+                self.locked = True
+                self.save()
+        if self.locked:
+            devs.clock_cal_set(self.offset)
+            if time.ticks_diff(time.ticks_ms(), self.save_ticks) > CAL_SAVE_SECS*1000:
+                self.save()
+        return True
+    # Save calibration, so it is used by all modules after restart
+    def save(self):
+        devs.clock_cal_save(self.offset)
+        self.save_ticks = time.ticks_ms()
+    # Get clock error in parts per million
+    def ppm(self):
+        return self.offset * 1e6 / CLOCK_NOMINAL
+
+if __name__ == "__main__":
+    print("PWM output pin %u, freq input pin %u, PPS input pin %u" %
+          (PWM_OUT_PIN, PWM_IN_PIN, PPS_IN_PIN))
+    test_signal = pwm_out(PWM_OUT_PIN, PWM_DIV, PWM_LEVEL, PWM_WRAP)
+
+    counter = pulse_counter_init(PWM_IN_PIN)
+    counter_dma = pulse_counter_ext_init(counter)
+    sysclk = sysclk_counter_init(SYSCLK_COUNTER_PIN)
+    pps = pps_input_init(PPS_IN_PIN)
+    pps_dmas = (pps_dma_init(pps, devs.TIMER_RAWL_ADDR),
+                pps_dma_init(pps, sysclk.get_counter_address()),
+                pps_dma_init(pps, counter_dma.get_trans_count_address()))
+    buffs = tick_data, cycle_data, count_data
+    cal = ClockCal()
+    print("Clock %u %+1.2f Hz (%s)" % (CLOCK_NOMINAL, cal.offset,
+          "calibrated" if cal.locked else "nominal"))
+
+    last, n, nsecs = None, 0, 0
+    pulse_counter_ext_start(counter_dma)
+    pps_capture_start(pps, pps_dmas, buffs)
+    while nsecs < NSECS:
+        count = pps_capture_count(pps_dmas)
+        while n < count:
+            cap = tick_data[n], cycle_data[n], count_data[n]
+            if last:
+                secs, cycles, pulses = pps_interval(last, cap)
+                if cal.update(secs, cycles):
+                    nsecs += secs
+                    print("Freq %u Hz, clock %u %+1.2f Hz (%+3.3f ppm)%s" % (pulses // secs,
+                          CLOCK_NOMINAL, cal.offset, cal.ppm(), "" if cal.locked else " unlocked"))
+            last = cap
+            n += 1
+        # Restart extended counter between PPS edges; next interval is discarded
+        if pulse_counter_ext_low(counter_dma):
+            pulse_counter_ext_start(counter_dma)
+            last = None
+        if n >= NCAPTURES:
+            pps_capture_start(pps, pps_dmas, buffs)
+            n = 0
+        time.sleep(0.1)
+    pps.set_enabled(False)
+
+# EOF
@@ -0,0 +1,195 @@
+# Pico MicroPython: pulse rate profile, using DMA timer to sample the counter
+#
+# Copyright (c) 2021 Jeremy P Bentham
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# v0.01 agent 19/10/26 Adapted from pico_counter.py
+# v0.02 agent 19/10/26 Single sample buffer, clamp sample rate to DMA timer range
+
+import time, micropython, pico_devices as devs
+
+PWM_OUT_PIN, PWM_IN_PIN = 4, 3
+
+# Output signal for testing, swept from 10 to 100 kHz during capture
+PWM_DIV = int(devs.CLOCK_NOMINAL/1e6)   # 1 MHz
+PWM_WRAPS = (99, 49, 24, 19, 14, 9)     # 1 MHz / (wrap + 1) = 10 to 100 kHz
+PWM_STEP_MSEC = 20
+
+SAMPLE_RATE = 100e3             # Counter sample rate
+NSAMPLES = 20000                # Number of samples (0.2 sec at 100 kHz, 80 KB)
+SMOOTH_WINDOW = 10              # Number of samples in moving average
+DMA_TIMER = 0                   # DMA pacing timer number
+USE_EXT_COUNTER = False         # Set True to sample the extended counter
+EXT_COUNT_MAX = 0xfffffff
+
+DMA_TIMER_MAX = 0xffff          # Max DMA timer fraction numerator & denominator
+
+ext_data = devs.array32(1)      # Dummy array for extended counter
+# Counter samples, replaced by pulse counts when processed
+sample_data = devs.array32(NSAMPLES)
+
+# Start a PWM output
+def pwm_out(pin, div, level, wrap):
+    devs.gpio_set_function(pin, devs.GPIO_FUNC_PWM)
+    pwm = devs.PWM(pin)
+    pwm.set_clkdiv_int_frac(div, 0)
+    pwm.set_wrap(wrap)
+    pwm.set_chan_level(pwm.gpio_to_channel(pin), level)
+    pwm.set_enabled(1)
+    return pwm
+
+# Initialise PWM as a pulse counter (gpio must be odd number)
+def pulse_counter_init(pin, rising=True):
+    if pin & 1 == 0:
+        print("Error: pulse counter must be odd GPIO pin")
+    devs.gpio_set_function(pin, devs.GPIO_FUNC_PWM)
+    pwm = devs.PWM(pin)
+    pwm.set_clkdiv_mode(devs.PWM_DIV_B_RISING if rising else devs.PWM_DIV_B_FALLING)
+    pwm.set_clkdiv(1)
+    return pwm
+
+# Use DMA to extend pulse counter to 28 bits, and start it
+def pulse_counter_ext_init(ctr):
+    ctr.set_enabled(False)
+    ctr.set_wrap(0)
+    ctr.set_ctr(0)
+    dma = devs.DMA()
+    dma.set_transfer_data_size(devs.DMA_SIZE_8)
+    dma.set_read_increment(False)
+    dma.set_write_increment(False)
+    dma.set_read_addr(devs.addressof(ext_data))
+    dma.set_write_addr(devs.addressof(ext_data))
+    dma.set_dreq(ctr.get_dreq())
+    dma.set_trans_count(EXT_COUNT_MAX, True)
+    ctr.set_enabled(True)
+    return dma
+
+# Get DMA timer fraction x/y (16-bit values) closest to rate / clock
+# Ratio is limited to the timer range, 1/65535 to 1
+def dma_timer_fraction(rate, clock):
+    x = min(max(rate / clock, 1 / DMA_TIMER_MAX), 1)
+    h0, h1, k0, k1 = 0, 1, 1, 0
+    while True:
+        a = int(x)
+        h2, k2 = a*h1 + h0, a*k1 + k0
+        if h2 > DMA_TIMER_MAX or k2 > DMA_TIMER_MAX:
+            break
+        h0, h1, k0, k1 = h1, h2, k1, k2
+        if x - a < 1e-6:
+            break
+        x = 1 / (x - a)
+    return (h1, k1) if h1 else (1, DMA_TIMER_MAX)
+
+# Initialise DMA timer, return actual sample rate
+def sample_timer_init(timer, rate):
+    if not devs.CLOCK_NOMINAL / DMA_TIMER_MAX <= rate <= devs.CLOCK_NOMINAL:
+        print("Error: sample rate out of range, using nearest")
+    x, y = dma_timer_fraction(rate, devs.CLOCK_NOMINAL)
+    devs.dma_timer_set(timer, x, y)
+    return devs.CLOCK_FREQ * x / y
+
+# Initialise DMA to copy counter value when DMA timer triggers
+def sample_dma_init(timer, addr, size):
+    dma = devs.DMA()
+    dma.set_transfer_data_size(size)
+    dma.set_read_increment(False)
+    dma.set_write_increment(True)
+    dma.set_dreq(devs.DREQ_DMA_TIMER0 + timer)
+    dma.set_read_addr(addr)
+    return dma
+
+# Start sampling the counter
+def sample_start(dma, buff):
+    dma.abort()
+    dma.set_write_addr(devs.addressof(buff))
+    dma.set_trans_count(len(buff), True)
+
+# Check if sampling is complete
+def sample_complete(dma):
+    return dma.get_trans_count() == 0
+
+# Replace 16-bit counter samples with pulse count for each interval
+@micropython.viper
+def counter_diffs(samples: ptr32, n: int) -> int:
+    i = 0
+    while i < n-1:
+        samples[i] = (samples[i+1] - samples[i]) & 0xffff
+        i += 1
+    return n-1 if n > 0 else 0
+
+# Replace extended (down) counter samples with pulse count for each interval
+@micropython.viper
+def ext_counter_diffs(samples: ptr32, n: int) -> int:
+    i = 0
+    while i < n-1:
+        samples[i] = (samples[i] - samples[i+1]) & 0xfffffff
+        i += 1
+    return n-1 if n > 0 else 0
+
+# Replace counts with moving sum over window, return number of sums
+@micropython.viper
+def moving_sum(counts: ptr32, n: int, window: int) -> int:
+    if window < 1 or n < window:
+        return 0
+    total = 0
+    i = 0
+    while i < window:
+        total += counts[i]
+        i += 1
+    i = 0
+    while i <= n - window:
+        oldest = counts[i]
+        counts[i] = total
+        if i + window < n:
+            total += counts[i+window] - oldest
+        i += 1
+    return n - window + 1
+
+# Convert counter samples into pulse rate profile (counts per window)
+# Samples are replaced by the profile, return number of profile values
+def rate_profile(samples, n, ext=False, window=SMOOTH_WINDOW):
+    if ext:
+        n = ext_counter_diffs(samples, n)
+    else:
+        n = counter_diffs(samples, n)
+    return moving_sum(samples, n, window)
+
+if __name__ == "__main__":
+    print("PWM output pin %u, freq input pin %u" % (PWM_OUT_PIN, PWM_IN_PIN))
+    test_signal = pwm_out(PWM_OUT_PIN, PWM_DIV, (PWM_WRAPS[0]+1)//2, PWM_WRAPS[0])
+
+    counter = pulse_counter_init(PWM_IN_PIN)
+    if USE_EXT_COUNTER:
+        counter_dma = pulse_counter_ext_init(counter)
+        addr = counter_dma.get_trans_count_address()
+    else:
+        counter.set_enabled(True)
+        addr = counter.get_counter_address()
+    rate = sample_timer_init(DMA_TIMER, SAMPLE_RATE)
+    sample_dma = sample_dma_init(DMA_TIMER, addr, devs.DMA_SIZE_32)
+
+    sample_start(sample_dma, sample_data)
+    for wrap in PWM_WRAPS:
+        test_signal.set_wrap(wrap)
+        test_signal.set_chan_level(test_signal.gpio_to_channel(PWM_OUT_PIN), (wrap+1)//2)
+        time.sleep_ms(PWM_STEP_MSEC)
+    while not sample_complete(sample_dma):
+        pass
+    nrates = rate_profile(sample_data, NSAMPLES, USE_EXT_COUNTER)
+    scale = rate / SMOOTH_WINDOW
+    print("%u samples at %3.1f kHz, window %u" % (NSAMPLES, rate/1000, SMOOTH_WINDOW))
+    for n in range(0, nrates, max(1, nrates // 20)):
+        print("%7.3f ms %7.3f kHz" % (n * 1000 / rate, sample_data[n] * scale / 1000))
+
+# EOF
@@ -18,6 +18,7 @@
 # v0.01 JPB 20/8/23 Adapted from pico_freq.py
 # v0.02 JPB 21/8/23 Removed unneeded gate definitions
 # v0.03 JPB 15/10/24 Adapted to work with RP2040 and RP2350
+# v0.04 agent 19/10/26 Use calibrated timer frequency
 
 import time, pico_devices as devs
 
@@ -26,10 +27,10 @@ PWM_OUT_PIN, PWM_IN_PIN = 4, 3
 # Output signal for testing
 # Divisor value must be < 256, and wrap value < 65536
 if devs.PICO2:
-    PWM_DIV = int(devs.CLOCK_FREQ/600e3)  # 600 kHz
+    PWM_DIV = int(devs.CLOCK_NOMINAL/600e3)  # 600 kHz
     PWM_WRAP = 60000 - 1                  # 600 kHz / 60000 = 10 Hz
 else:
-    PWM_DIV = int(devs.CLOCK_FREQ/500e3)  # 500 kHz
+    PWM_DIV = int(devs.CLOCK_NOMINAL/500e3)  # 500 kHz
     PWM_WRAP = 50000 - 1                  # 500 kHz / 50000 = 10 Hz
     
 PWM_LEVEL = (PWM_WRAP+1)//2           # 50% PWM
@@ -96,7 +97,7 @@ if __name__ == "__main__":
     data = time_data[0:count]
     diffs = [data[n]-data[n-1] for n in range(1, len(data))]
     total = sum(diffs)
-    freq = (1e6 * len(diffs) / total) if total else 0
+    freq = (devs.TIMER_FREQ * len(diffs) / total) if total else 0
     print("%u samples, total %u us, freq %5.3f Hz" % (count, total, freq))
     
 # EOF
@@ -5,8 +5,11 @@
 
 // v0.01 JPB 28/7/23 Adapted from QSpeed v0.14
 // v0.02 JPB 29/7/23 Removed redundant code
+// v0.03 agent 19/10/26 Moved measurement code into freq_engine.c
+//                      Counter overflows are detected by PWM wrap interrupt
+//                      Edge times are uint32_t, to match freq_engine
 
-#define VERSION "0.02"
+#define VERSION "0.03"
 
 #include <stdio.h>
 #include <string.h>
@@ -14,6 +17,8 @@
 #include "hardware/clocks.h"
 #include "hardware/pwm.h"
 #include "hardware/dma.h"
+#include "hardware/irq.h"
+#include "freq_engine.h"
 
 // Set zero to use edge-counter, 1 to use edge-timer (reciprocal measurement)
 #define USE_EDGE_TIMER      0
@@ -31,14 +36,19 @@
 #define NUM_EDGE_TIMES      11
 #define EDGE_WAIT_USEC      200001
 
-uint gate_dma_chan, gate_dma_dreq, csr_stopval;
-uint counter_slice, gate_slice;
-uint counter_lastval, counter_overflow;
-uint timer_dma_chan;
+#ifndef PWM_DEFAULT_IRQ_NUM
+#define PWM_DEFAULT_IRQ_NUM() PWM_IRQ_WRAP
+#endif
 
-uint edge_times[NUM_EDGE_TIMES]; 
+uint counter_slice;
+fe_hw freq_hw;
+fe_gate freq_gate;
+fe_edge freq_edge;
+
+uint32_t edge_times[NUM_EDGE_TIMES];
 
 void gate_timer_init(int pin);
+void counter_wrap_irq(void);
 void freq_counter_init(int pin);
 void freq_counter_start(void);
 bool freq_counter_value_ready(void);
@@ -91,29 +101,44 @@ int main()
 // Initialise gate timer, and DMA to control the counter
 void gate_timer_init(int pin)
 {
-    gate_slice = pwm_gpio_to_slice_num(pin);
-    io_rw_32 *counter_slice_csr = &pwm_hw->slice[counter_slice].csr;
+    uint gate_slice = pwm_gpio_to_slice_num(pin);
     
     pwm_set_clkdiv_int_frac(gate_slice, TIMER_PRESCALE, 0);
     pwm_set_wrap(gate_slice, TIMER_WRAP/2 - 1);
     pwm_set_chan_level(gate_slice, PWM_CHAN_B, TIMER_WRAP/4);
     pwm_set_phase_correct(gate_slice, true);
         
-    gate_dma_chan = dma_claim_unused_channel(true);
+    uint gate_dma_chan = dma_claim_unused_channel(true);
     dma_channel_config cfg = dma_channel_get_default_config(gate_dma_chan);
     channel_config_set_transfer_data_size(&cfg, DMA_SIZE_32);
     channel_config_set_read_increment(&cfg, false);
     channel_config_set_dreq(&cfg, pwm_get_dreq(gate_slice));
-    csr_stopval = *counter_slice_csr;
-    dma_channel_configure(gate_dma_chan, &cfg, counter_slice_csr, &csr_stopval, 1, false);
+    dma_channel_set_config(gate_dma_chan, &cfg, false);
+    fe_gate_init(&freq_gate, &freq_hw, counter_slice, gate_slice, gate_dma_chan, FE_NO_CHAN);
+    
+    pwm_clear_irq(counter_slice);
+    pwm_set_irq_enabled(counter_slice, true);
+    irq_set_exclusive_handler(PWM_DEFAULT_IRQ_NUM(), counter_wrap_irq);
+    irq_set_enabled(PWM_DEFAULT_IRQ_NUM(), true);
     pwm_set_enabled(gate_slice, true);
 }
 
+// Interrupt handler for counter wraparound (overflow)
+void counter_wrap_irq(void)
+{
+    pwm_clear_irq(counter_slice);
+    fe_gate_wrap_irq(&freq_gate);
+}
+
 // Initialise frequency counter
 void freq_counter_init(int pin) 
 {
     assert(pwm_gpio_to_channel(pin) == PWM_CHAN_B);
     counter_slice = pwm_gpio_to_slice_num(pin);
+    freq_hw.pwm_base = (volatile uint32_t *)pwm_hw;
+    freq_hw.pwm_en = &pwm_hw->en;
+    freq_hw.dma_base = (volatile uint32_t *)dma_hw;
+    freq_hw.dma_abort = &dma_hw->abort;
 
     gpio_set_function(pin, GPIO_FUNC_PWM);
     pwm_config cfg = pwm_get_default_config();
@@ -125,30 +150,20 @@ void freq_counter_init(int pin)
 // Start frequency counter
 void freq_counter_start(void)
 {
-    dma_channel_transfer_from_buffer_now(gate_dma_chan, &csr_stopval, 1);
-    pwm_set_counter(counter_slice, 0);
-    pwm_set_counter(gate_slice, 0);
-    counter_lastval = counter_overflow = 0;
-    pwm_set_mask_enabled((1 << counter_slice) | (1 << gate_slice));
+    fe_gate_start(&freq_gate);
 }
 
-// Check for overflow, and check if capture complete
+// Check if capture complete (overflows are counted by interrupt)
 bool freq_counter_value_ready(void)
 {
-    uint n = pwm_get_counter(counter_slice);
-    
-    if (n < counter_lastval)
-        counter_overflow++;
-    counter_lastval = n;
-    return (!dma_channel_is_busy(gate_dma_chan));
+    return (fe_gate_ready(&freq_gate));
 }
 
 // Get counter value
 int freq_counter_value(void)
 {
-    while (dma_channel_is_busy(gate_dma_chan)) ;
-    pwm_set_enabled(gate_slice, false);    
-    return((uint16_t)pwm_get_counter(counter_slice) + counter_overflow*65537);
+    while (!fe_gate_ready(&freq_gate)) ;
+    return (fe_gate_value(&freq_gate));
 }
 
 // Get frequency value, return -ve if not ready
@@ -164,7 +179,7 @@ int edge_counter_frequency(void)
 // Initialise DMA to transfer the edge times
 void edge_timer_init(void) 
 {
-    timer_dma_chan = dma_claim_unused_channel(true);
+    uint timer_dma_chan = dma_claim_unused_channel(true);
     dma_channel_config cfg = dma_channel_get_default_config(timer_dma_chan);
     channel_config_set_transfer_data_size(&cfg, DMA_SIZE_32);
     channel_config_set_read_increment(&cfg, false);
@@ -172,29 +187,24 @@ void edge_timer_init(void)
     channel_config_set_dreq(&cfg, pwm_get_dreq(counter_slice));
     dma_channel_configure(timer_dma_chan, &cfg, edge_times, &timer_hw->timerawl, NUM_EDGE_TIMES, false);
     pwm_set_wrap(counter_slice, 0);
+    fe_edge_init(&freq_edge, &freq_hw, counter_slice, timer_dma_chan);
 }
 
 // Start DMA to record pulse times
 void edge_timer_start(void)
 {
-    dma_channel_transfer_to_buffer_now(timer_dma_chan, edge_times, NUM_EDGE_TIMES);
-    pwm_set_enabled(counter_slice, true);
+    fe_edge_start(&freq_edge, edge_times, NUM_EDGE_TIMES);
 }
 
 // Get average of the edge times
 int edge_timer_value(void)
 {
-    uint i=1, n;
-    int total=0;
-    dma_channel_abort(timer_dma_chan);
-    pwm_set_enabled(counter_slice, false);    
-    while (i<NUM_EDGE_TIMES && edge_times[i])
-    {
-        n = edge_times[i] - edge_times[i-1];
-        total += n;
-        i++;
-    }
-    return(i>1 ? total / (i - 1) : 0);
+    int n;
+    uint total;
+    
+    fe_edge_stop(&freq_edge);
+    total = fe_edge_total(edge_times, NUM_EDGE_TIMES, &n);
+    return(n ? total / n : 0);
 }
 
 // Get frequency value from edge timer
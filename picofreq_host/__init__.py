@@ -0,0 +1,25 @@
+# PicoFreq host: read frequency values from many Pico boards
+#
+# Copyright (c) 2026 PicoFreq contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# v0.01 agent 19/10/26 First version
+
+from .parse import StreamParser, encode_frame, split_records
+from .store import ColumnStore
+from .reader import Aggregator
+
+__all__ = ["StreamParser", "encode_frame", "split_records", "ColumnStore", "Aggregator"]
+
+# EOF
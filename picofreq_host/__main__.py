@@ -0,0 +1,46 @@
+# PicoFreq host: read frequency values from many Pico boards into a store
+#
+# Copyright (c) 2026 PicoFreq contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# v0.01 agent 19/10/26 First version
+
+import argparse, asyncio, logging
+from .reader import Aggregator
+from .store import ColumnStore
+
+# Print a sample
+def print_sample(source, t_ns, ticks, freq):
+    print("%u.%06u source %u freq %5.3f Hz" % (t_ns // 1000000000, t_ns // 1000 % 1000000, source, freq))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m picofreq_host",
+                                     description="Read frequency values from Pico boards")
+    parser.add_argument("sources", nargs="+", help="serial device, or host:port")
+    parser.add_argument("--store", default="picofreq_data", help="store directory")
+    parser.add_argument("--raw", help="directory to record raw streams, for replay")
+    parser.add_argument("--quiet", action="store_true", help="don't print samples")
+    args = parser.parse_args()
+    logging.basicConfig(format="%(message)s")
+
+    with ColumnStore(args.store) as store:
+        agg = Aggregator(store, None if args.quiet else print_sample, args.raw)
+        try:
+            asyncio.run(agg.run(args.sources))
+        except KeyboardInterrupt:
+            pass
+        print("%u samples, %u errors, %u failed sources, %u rows in store" %
+              (agg.samples, agg.errors, len(agg.failed), store.rows))
+
+# EOF
@@ -0,0 +1,138 @@
+# PicoFreq host: benchmark, replaying recorded streams over local PTYs
+#
+# Copyright (c) 2026 PicoFreq contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# v0.01 agent 19/10/26 First version
+
+import argparse, asyncio, collections, os, tempfile, time, tty
+from .parse import StreamParser, encode_frame, split_records
+from .reader import Aggregator
+from .store import ColumnStore
+
+BATCH_SECS = 0.001          # Interval between writes to each PTY
+HIGH_WATER = 65536          # Max bytes waiting to be written to a PTY
+DONE_TIMEOUT = 5.0          # Max time to wait for last samples after replay
+
+# Create a recording with text output from C & Python, and binary frames
+def synth_recording(nrecords):
+    recs = []
+    for n in range(nrecords):
+        freq = 100000 + (n % 1000)
+        kind = n % 4
+        if kind == 0:
+            recs.append(b"Frequency %u Hz\n" % freq)
+        elif kind == 1:
+            recs.append(b"Gate 250.0 ms, count %u, freq %3.1f kHz\n" % (freq//4, freq/1e3))
+        elif kind == 2:
+            recs.append(b"9 samples, total 800000 us, freq %5.3f Hz\n" % (freq/1e4))
+        else:
+            recs.append(encode_frame(n * 1000, float(freq)))
+    return b"".join(recs)
+
+# Split recording into records, with number of samples in each
+def load_records(data):
+    recs = split_records(data)
+    return [(rec, len(StreamParser().feed(rec + b"\n"))) for rec in recs]
+
+# Write records to PTY master at given rate, saving the time each sample is sent
+async def replay(fd, records, rate, sent):
+    loop = asyncio.get_running_loop()
+    f = os.fdopen(fd, "wb", buffering=0, closefd=False)
+    transport, _ = await loop.connect_write_pipe(asyncio.Protocol, f)
+    batch = max(1, int(rate * BATCH_SECS))
+    deadline = time.monotonic()
+    for i in range(0, len(records), batch):
+        recs = records[i:i+batch]
+        t_ns = time.time_ns()
+        for rec, nsamples in recs:
+            sent.extend([t_ns] * nsamples)
+        transport.write(b"".join(rec for rec, _ in recs))
+        deadline += BATCH_SECS
+        delay = deadline - time.monotonic()
+        await asyncio.sleep(max(delay, 0))
+        while transport.get_write_buffer_size() > HIGH_WATER:
+            await asyncio.sleep(BATCH_SECS)
+    while transport.get_write_buffer_size():
+        await asyncio.sleep(BATCH_SECS)
+
+# Get percentile of sorted values
+def percentile(vals, pct):
+    return vals[min(len(vals)-1, int(len(vals) * pct / 100))] if vals else 0
+
+# Run the benchmark, return dictionary of results
+async def run_bench(nports, records, rate, store_path):
+    ptys = [os.openpty() for _ in range(nports)]
+    for _, slave in ptys:
+        tty.setraw(slave)
+    names = [os.ttyname(slave) for _, slave in ptys]
+    sent = [collections.deque() for _ in range(nports)]
+    latencies = []
+    expected = nports * sum(n for _, n in records)
+
+    with ColumnStore(store_path) as store:
+        sources = [store.source_number(name) for name in names]
+        source_index = {s: i for i, s in enumerate(sources)}
+        def on_sample(source, t_ns, ticks, freq):
+            q = sent[source_index[source]]
+            if q:
+                latencies.append(t_ns - q.popleft())
+        agg = Aggregator(store, on_sample)
+        start = time.monotonic()
+        reader = asyncio.ensure_future(agg.run(names))
+        await asyncio.gather(*[replay(master, records, rate, q)
+                               for (master, _), q in zip(ptys, sent)])
+        end = time.monotonic() + DONE_TIMEOUT
+        while agg.samples < expected and time.monotonic() < end:
+            await asyncio.sleep(BATCH_SECS)
+        elapsed = time.monotonic() - start
+        for master, slave in ptys:
+            os.close(master)
+            os.close(slave)
+        await reader
+
+        t1 = store.cols["t_ns"][0] if store.rows else 0
+        qstart = time.perf_counter()
+        rows = store.query(t1, t1 + 1000000000)
+        qtime = time.perf_counter() - qstart
+        latencies.sort()
+        return {"ports": nports, "expected": expected, "samples": agg.samples,
+                "errors": agg.errors, "secs": elapsed,
+                "throughput": agg.samples / elapsed if elapsed else 0,
+                "lat_p50_us": percentile(latencies, 50) / 1e3,
+                "lat_p99_us": percentile(latencies, 99) / 1e3,
+                "lat_max_us": (latencies[-1] if latencies else 0) / 1e3,
+                "query_rows": len(rows["t_ns"]), "query_ms": qtime * 1e3}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark PicoFreq host aggregator")
+    parser.add_argument("--ports", type=int, default=8, help="number of PTYs")
+    parser.add_argument("--records", type=int, default=20000, help="records per port, if synthetic")
+    parser.add_argument("--rate", type=float, default=20000, help="records per second per port")
+    parser.add_argument("--replay", help="file with recorded stream to replay on each port")
+    parser.add_argument("--store", help="store directory (default: temporary)")
+    args = parser.parse_args()
+
+    data = open(args.replay, "rb").read() if args.replay else synth_recording(args.records)
+    records = load_records(data)
+    with tempfile.TemporaryDirectory() as tmp:
+        res = asyncio.run(run_bench(args.ports, records, args.rate, args.store or tmp))
+    print("%u ports, %u/%u samples, %u errors, %3.2f s, %u samples/s" %
+          (res["ports"], res["samples"], res["expected"], res["errors"],
+           res["secs"], res["throughput"]))
+    print("Latency p50 %3.1f us, p99 %3.1f us, max %3.1f us" %
+          (res["lat_p50_us"], res["lat_p99_us"], res["lat_max_us"]))
+    print("Query 1 s: %u rows in %3.3f ms" % (res["query_rows"], res["query_ms"]))
+
+# EOF
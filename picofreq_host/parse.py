@@ -0,0 +1,103 @@
+# PicoFreq host: parse text and binary frequency values from a Pico
+#
+# Copyright (c) 2026 PicoFreq contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# v0.01 agent 19/10/26 First version
+# v0.02 agent 19/10/26 Made unit prefix case-sensitive
+
+import re, struct
+
+# Text output, e.g. "Frequency 100000 Hz" from picofreq.c,
+# or "... freq 100.0 kHz" from the MicroPython scripts
+# Only the word is case-insensitive, so "mHz" isn't taken as "MHz"
+TEXT_FREQ = re.compile(rb"\b(?i:freq(?:uency)?)\s+([-+]?\d+(?:\.\d*)?)\s*([kM]?)Hz")
+TEXT_SCALE = {b"": 1.0, b"k": 1e3, b"M": 1e6}
+
+# Binary output: sync bytes, 32-bit device time (usec), 64-bit float frequency,
+# and 8-bit checksum of the data. Sync bytes can't occur in text output
+FRAME_SYNC = b"\xa5\x5a"
+FRAME_DATA = struct.Struct("<Id")
+FRAME_LEN = len(FRAME_SYNC) + FRAME_DATA.size + 1
+NO_TICKS = -1               # Device time, if not available
+MAX_LINE = 1024             # Max length of text line
+
+# Create a binary frame
+def encode_frame(ticks, freq):
+    data = FRAME_DATA.pack(ticks & 0xffffffff, freq)
+    return FRAME_SYNC + data + bytes([sum(data) & 0xff])
+
+# Split a recorded stream into text lines and binary frames
+def split_records(data):
+    recs, pos = [], 0
+    while pos < len(data):
+        sync, nl = data.find(FRAME_SYNC, pos), data.find(b"\n", pos)
+        if sync == pos:
+            end = pos + FRAME_LEN
+        elif sync >= 0 and (nl < 0 or sync < nl):
+            end = sync
+        else:
+            end = nl + 1 if nl >= 0 else len(data)
+        recs.append(data[pos:end])
+        pos = end
+    return recs
+
+# Class to get frequency values from a stream of bytes
+class StreamParser:
+    def __init__(self):
+        self.buff = bytearray()
+        self.errors = 0
+    # Add data to the stream, return list of (device ticks, frequency)
+    def feed(self, data):
+        buff = self.buff
+        buff += data
+        out, pos = [], 0
+        while True:
+            sync, nl = buff.find(FRAME_SYNC, pos), buff.find(b"\n", pos)
+            if sync >= 0 and (nl < 0 or sync < nl):
+                if sync > pos:
+                    self.parse_line(buff[pos:sync], out)
+                    pos = sync
+                if len(buff) - sync < FRAME_LEN:
+                    break
+                if not self.parse_frame(buff, sync, out):
+                    self.errors += 1
+                    pos = sync + 1
+                else:
+                    pos = sync + FRAME_LEN
+            elif nl >= 0:
+                self.parse_line(buff[pos:nl], out)
+                pos = nl + 1
+            else:
+                break
+        del buff[:pos]
+        if len(buff) > MAX_LINE and buff.find(FRAME_SYNC) < 0:
+            self.errors += 1
+            del buff[:]
+        return out
+    # Get frequency from text line, if present
+    def parse_line(self, line, out):
+        m = TEXT_FREQ.search(line)
+        if m:
+            out.append((NO_TICKS, float(m.group(1)) * TEXT_SCALE[m.group(2)]))
+    # Get device time & frequency from binary frame, return False if invalid
+    def parse_frame(self, buff, pos, out):
+        start = pos + len(FRAME_SYNC)
+        data = buff[start:start+FRAME_DATA.size]
+        if sum(data) & 0xff != buff[start+FRAME_DATA.size]:
+            return False
+        out.append(FRAME_DATA.unpack(data))
+        return True
+
+# EOF
@@ -0,0 +1,120 @@
+# PicoFreq host: read many serial ports or sockets concurrently, using asyncio
+#
+# Copyright (c) 2026 PicoFreq contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# v0.01 agent 19/10/26 First version
+# v0.02 agent 19/10/26 Errors on one source don't stop the others
+# v0.03 agent 19/10/26 Only EIO on read is taken as end of stream
+
+import asyncio, errno, logging, os, termios, time, tty
+from .parse import StreamParser
+
+READ_SIZE = 4096            # Max bytes per read
+FLUSH_SECS = 1.0            # Interval between store flushes
+
+log = logging.getLogger(__name__)
+
+# Open serial port or PTY in raw mode, return asyncio stream reader
+async def open_serial(path):
+    loop = asyncio.get_running_loop()
+    fd = os.open(path, os.O_RDWR | os.O_NOCTTY | os.O_NONBLOCK)
+    if os.isatty(fd):
+        tty.setraw(fd, termios.TCSANOW)
+    reader = asyncio.StreamReader(limit=READ_SIZE*16)
+    f = os.fdopen(fd, "rb", buffering=0)
+    transport, _ = await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), f)
+    return reader, transport
+
+# Open TCP socket, return asyncio stream reader
+async def open_socket(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    return reader, writer
+
+# Open source given as "host:port" or serial device path
+async def open_source(name):
+    host, sep, port = name.rpartition(":")
+    if sep and port.isdigit() and not os.path.exists(name):
+        return await open_socket(host or "localhost", int(port))
+    return await open_serial(name)
+
+# Class to read frequency values from many sources into a column store
+class Aggregator:
+    def __init__(self, store, on_sample=None, raw_dir=None):
+        self.store = store
+        self.on_sample = on_sample
+        self.raw_dir = raw_dir
+        self.samples = self.errors = 0
+        self.failed = {}
+    # Read from one source until end of stream
+    async def read_source(self, name, reader, closer=None):
+        source = self.store.source_number(name)
+        parser = StreamParser()
+        raw = self.open_raw(source)
+        try:
+            while True:
+                try:
+                    data = await reader.read(READ_SIZE)
+                except OSError as e:
+                    # PTY returns EIO when the other end closes
+                    if e.errno != errno.EIO:
+                        raise
+                    data = b""
+                t_ns = time.time_ns()
+                if not data:
+                    break
+                if raw:
+                    raw.write(data)
+                for ticks, freq in parser.feed(data):
+                    self.store.append(t_ns, source, freq, ticks)
+                    self.samples += 1
+                    if self.on_sample:
+                        self.on_sample(source, t_ns, ticks, freq)
+        finally:
+            self.errors += parser.errors
+            if raw:
+                raw.close()
+            if closer:
+                closer.close()
+    # Open and read one source, logging any error so other sources keep running
+    async def run_source(self, name):
+        try:
+            reader, closer = await open_source(name)
+            await self.read_source(name, reader, closer)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.error("Source %s failed: %r", name, e)
+            self.failed[name] = e
+    # Open file to record the raw stream from a source, for later replay
+    def open_raw(self, source):
+        if not self.raw_dir:
+            return None
+        os.makedirs(self.raw_dir, exist_ok=True)
+        return open(os.path.join(self.raw_dir, "source%u.raw" % source), "ab")
+    # Flush the store at intervals, so readers can see the data
+    async def flush_task(self):
+        while True:
+            await asyncio.sleep(FLUSH_SECS)
+            self.store.flush()
+    # Open and read all sources, until all have closed or failed
+    async def run(self, names):
+        flusher = asyncio.ensure_future(self.flush_task())
+        try:
+            await asyncio.gather(*[self.run_source(name) for name in names])
+        finally:
+            flusher.cancel()
+            self.store.flush()
+
+# EOF
@@ -0,0 +1,122 @@
+# PicoFreq host: append-only memory-mapped column store
+#
+# Copyright (c) 2026 PicoFreq contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# v0.01 agent 19/10/26 First version
+
+import array, bisect, json, mmap, os, struct
+
+# Columns: host receive time (nsec), source number, frequency (Hz), device time
+COLUMNS = (("t_ns", "q"), ("source", "H"), ("freq", "d"), ("ticks", "q"))
+CHUNK_ROWS = 65536          # Number of rows added when a column is extended
+ROWS_FILE = "rows"          # Number of valid rows, updated after each append
+SOURCES_FILE = "sources.json"
+ROWS = struct.Struct("<Q")
+
+# Class for a directory of column files, indexed by host receive time
+class ColumnStore:
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.rows_map = self.map_file(ROWS_FILE, ROWS.size)
+        self.rows = ROWS.unpack_from(self.rows_map)[0]
+        self.sources = self.load_sources()
+        self.maps, self.cols = {}, {}
+        self.capacity = 0
+        self.map_columns(max(self.rows, CHUNK_ROWS))
+        self.last_t = self.cols["t_ns"][self.rows-1] if self.rows else 0
+    # Map a file, extending it to the given size if necessary
+    def map_file(self, name, size):
+        fname = os.path.join(self.path, name)
+        fd = os.open(fname, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size < size:
+                os.ftruncate(fd, size)
+            return mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+    # Map all the column files, with room for given number of rows
+    def map_columns(self, nrows):
+        self.unmap_columns()
+        nrows = -(-nrows // CHUNK_ROWS) * CHUNK_ROWS
+        for name, code in COLUMNS:
+            size = nrows * struct.calcsize(code)
+            self.maps[name] = self.map_file(name + ".col", size)
+            self.cols[name] = memoryview(self.maps[name]).cast(code)
+        self.capacity = nrows
+    # Release column mappings
+    def unmap_columns(self):
+        for name in list(self.cols):
+            self.cols.pop(name).release()
+            self.maps.pop(name).close()
+    # Load list of source names
+    def load_sources(self):
+        try:
+            with open(os.path.join(self.path, SOURCES_FILE)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return []
+    # Get number for source name, adding it if new
+    def source_number(self, name):
+        if name not in self.sources:
+            self.sources.append(name)
+            fname = os.path.join(self.path, SOURCES_FILE)
+            with open(fname + ".tmp", "w") as f:
+                json.dump(self.sources, f)
+            os.replace(fname + ".tmp", fname)
+        return self.sources.index(name)
+    # Append a row; host time is kept in ascending order for queries
+    def append(self, t_ns, source, freq, ticks):
+        if self.rows >= self.capacity:
+            self.map_columns(self.rows + CHUNK_ROWS)
+        n, cols = self.rows, self.cols
+        self.last_t = t_ns = max(t_ns, self.last_t)
+        cols["t_ns"][n] = t_ns
+        cols["source"][n] = source
+        cols["freq"][n] = freq
+        cols["ticks"][n] = ticks
+        self.rows = n + 1
+        ROWS.pack_into(self.rows_map, 0, self.rows)
+    # Get range of row numbers for given host time range (start inclusive)
+    def time_range(self, t1_ns, t2_ns):
+        t = self.cols["t_ns"]
+        lo = bisect.bisect_left(t, t1_ns, 0, self.rows)
+        return lo, bisect.bisect_left(t, t2_ns, lo, self.rows)
+    # Get copy of columns for a host time range, as arrays
+    def query(self, t1_ns, t2_ns):
+        lo, hi = self.time_range(t1_ns, t2_ns)
+        result = {}
+        for name, code in COLUMNS:
+            result[name] = array.array(code)
+            result[name].frombytes(self.cols[name][lo:hi].cast("B"))
+        return result
+    # Write data to disk
+    def flush(self):
+        for m in self.maps.values():
+            m.flush()
+        self.rows_map.flush()
+    # Close the store
+    def close(self):
+        if self.rows_map is not None:
+            self.flush()
+            self.unmap_columns()
+            self.rows_map.close()
+            self.rows_map = None
+    def __enter__(self):
+        return self
+    def __exit__(self, *args):
+        self.close()
+
+# EOF
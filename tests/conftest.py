@@ -0,0 +1,29 @@
+# Stubs so the MicroPython scripts' arithmetic can be tested with CPython
+
+import array, builtins, os, sys, types
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+# Viper type names, used in annotations
+builtins.ptr8 = builtins.ptr16 = builtins.ptr32 = None
+
+micropython = types.ModuleType("micropython")
+micropython.viper = micropython.native = lambda f: f
+sys.modules["micropython"] = micropython
+
+# pico_devices needs uctypes, so replace it with the values used in calculations
+devs = types.ModuleType("pico_devices")
+devs.PICO2 = False
+devs.CLOCK_NOMINAL = devs.CLOCK_FREQ = 125e6
+devs.CLOCK_OFFSET = 0.0
+devs.CLOCK_SCALE = 1.0
+devs.TIMER_FREQ = 1e6
+devs.ADC_CLOCK_FREQ = 48e6
+devs.ADC_MIN_CYCLES = 96
+devs.array16 = lambda size: array.array("H", bytes(2 * size))
+devs.array32 = lambda size: array.array("I", bytes(4 * size))
+sys.modules["pico_devices"] = devs
+
+# EOF
@@ -0,0 +1,161 @@
+// Host test of freq_engine.c, using arrays in place of PWM & DMA registers
+
+#include <stdio.h>
+#include <string.h>
+#include "freq_engine.h"
+
+// Build with -DFE_HOST_TEST, so DMA abort doesn't wait for the register to clear
+
+#define PWM_CSR(s)              ((s) * 5)
+#define PWM_CTR(s)              ((s) * 5 + 2)
+#define DMA_READ_ADDR(c)        ((c) * 16)
+#define DMA_WRITE_ADDR(c)       ((c) * 16 + 1)
+#define DMA_TRANS_COUNT(c)      ((c) * 16 + 2)
+#define DMA_AL1_CTRL(c)         ((c) * 16 + 4)
+#define DMA_AL1_COUNT_TRIG(c)   ((c) * 16 + 7)
+#define ADDR(p)                 ((uint32_t)(uintptr_t)(p))
+
+static uint32_t pwm_regs[8 * 5 + 1], dma_regs[16 * 16 + 1];
+static fe_hw hw = {pwm_regs, &pwm_regs[8 * 5], dma_regs, &dma_regs[16 * 16]};
+static int failures;
+
+#define CHECK(x) check(x, #x, __LINE__)
+
+static void check(int ok, const char *s, int line)
+{
+    if (!ok)
+    {
+        printf("Line %d: %s failed\n", line, s);
+        failures++;
+    }
+}
+
+static void test_count_total(void)
+{
+    CHECK(fe_count_total(0, 0) == 0);
+    CHECK(fe_count_total(1234, 0) == 1234);
+    CHECK(fe_count_total(0, 1) == 65536);
+    CHECK(fe_count_total(0xffff, 2) == 3 * 65536 - 1);
+    CHECK(fe_count_total(0x12345, 1) == 0x12345);
+}
+
+static void test_edge_total(void)
+{
+    uint32_t times[5] = {1000, 2000, 3010, 3990, 0};
+    uint32_t wrap[3] = {0xfffffe00, 0x100, 0x400};
+    int n = -1;
+
+    CHECK(fe_edge_total(times, 5, &n) == 2990 && n == 3);
+    CHECK(fe_edge_total(times, 2, &n) == 1000 && n == 1);
+    CHECK(fe_edge_total(times, 1, &n) == 0 && n == 0);
+    CHECK(fe_edge_total(times, 0, &n) == 0 && n == 0);
+    CHECK(fe_edge_total(wrap, 3, &n) == 0x600 && n == 2);
+}
+
+static void test_gate(void)
+{
+    fe_gate g;
+
+    pwm_regs[PWM_CSR(3)] = 0x81;
+    fe_gate_init(&g, &hw, 3, 0, 2, 5);
+    CHECK(g.csr_stopval == 0x80);
+    CHECK(dma_regs[DMA_WRITE_ADDR(2)] == ADDR(&pwm_regs[PWM_CSR(3)]));
+    dma_regs[DMA_TRANS_COUNT(2)] = 1;
+    CHECK(!fe_gate_ready(&g));
+    dma_regs[DMA_TRANS_COUNT(2)] = 0;
+    CHECK(fe_gate_ready(&g));
+    dma_regs[DMA_TRANS_COUNT(5)] = 0xf0000000 | (FE_DMA_COUNT_MAX - 3);
+    CHECK(fe_gate_wraps(&g) == 3);
+    pwm_regs[PWM_CTR(3)] = 100;
+    *hw.pwm_en = 0x09;
+    CHECK(fe_gate_value(&g) == 3 * 65536 + 100);
+    CHECK(*hw.pwm_en == 0x08);
+
+    fe_gate_init(&g, &hw, 3, 0, 2, FE_NO_CHAN);
+    fe_gate_wrap_irq(&g);
+    fe_gate_wrap_irq(&g);
+    CHECK(fe_gate_wraps(&g) == 2);
+}
+
+static void test_gate_start(void)
+{
+    fe_gate g;
+
+    memset(pwm_regs, 0, sizeof(pwm_regs));
+    memset(dma_regs, 0, sizeof(dma_regs));
+    pwm_regs[PWM_CSR(3)] = 0x80;
+    pwm_regs[PWM_CTR(3)] = 1234;
+    pwm_regs[PWM_CTR(0)] = 5678;
+    dma_regs[DMA_AL1_CTRL(2)] = 0x3000;
+    *hw.pwm_en = 0x40;
+    fe_gate_init(&g, &hw, 3, 0, 2, 5);
+    g.wraps = 9;
+    fe_gate_start(&g);
+    CHECK(dma_regs[DMA_READ_ADDR(2)] == ADDR(&g.csr_stopval));
+    CHECK(dma_regs[DMA_AL1_CTRL(2)] == 0x3001);
+    CHECK(dma_regs[DMA_AL1_COUNT_TRIG(2)] == 1);
+    CHECK(dma_regs[DMA_AL1_CTRL(5)] == 1);
+    CHECK(dma_regs[DMA_AL1_COUNT_TRIG(5)] == FE_DMA_COUNT_MAX);
+    CHECK(*hw.dma_abort == 1u << 5);
+    CHECK(pwm_regs[PWM_CTR(3)] == 0 && pwm_regs[PWM_CTR(0)] == 0);
+    CHECK(*hw.pwm_en == 0x49);
+    CHECK(g.wraps == 0);
+
+    // Without a wrap DMA channel, only the gate channel is started
+    memset(dma_regs, 0, sizeof(dma_regs));
+    fe_gate_init(&g, &hw, 3, 0, 2, FE_NO_CHAN);
+    fe_gate_start(&g);
+    CHECK(*hw.dma_abort == 1u << 2);
+    CHECK(dma_regs[DMA_AL1_COUNT_TRIG(2)] == 1);
+}
+
+static void test_edge_start_stop(void)
+{
+    fe_edge e;
+    uint32_t times[10];
+
+    memset(pwm_regs, 0, sizeof(pwm_regs));
+    memset(dma_regs, 0, sizeof(dma_regs));
+    pwm_regs[PWM_CSR(1)] = 0x80;
+    pwm_regs[PWM_CTR(1)] = 99;
+    fe_edge_init(&e, &hw, 1, 4);
+    fe_edge_start(&e, times, 10);
+    CHECK(e.times == times && e.ntimes == 10);
+    CHECK(*hw.dma_abort == 1u << 4);
+    CHECK(dma_regs[DMA_WRITE_ADDR(4)] == ADDR(times));
+    CHECK(dma_regs[DMA_AL1_CTRL(4)] == 1);
+    CHECK(dma_regs[DMA_AL1_COUNT_TRIG(4)] == 10);
+    CHECK(pwm_regs[PWM_CTR(1)] == 0);
+    CHECK(pwm_regs[PWM_CSR(1)] == 0x81);
+
+    *hw.dma_abort = 0;
+    fe_edge_stop(&e);
+    CHECK(*hw.dma_abort == 1u << 4);
+    CHECK(pwm_regs[PWM_CSR(1)] == 0x80);
+}
+
+static void test_edge(void)
+{
+    fe_edge e;
+    uint32_t times[10];
+
+    fe_edge_init(&e, &hw, 1, 4);
+    e.times = times;
+    e.ntimes = 10;
+    dma_regs[DMA_TRANS_COUNT(4)] = 7;
+    CHECK(fe_edge_count(&e) == 3);
+}
+
+int main(void)
+{
+    test_count_total();
+    test_edge_total();
+    test_gate();
+    test_gate_start();
+    test_edge();
+    test_edge_start_stop();
+    printf("%s\n", failures ? "FAILED" : "OK");
+    return (failures != 0);
+}
+
+// EOF
@@ -0,0 +1,18 @@
+# Build and run the host test of freq_engine.c
+
+import os, shutil, subprocess, pytest
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(TEST_DIR)
+CC = os.environ.get("CC") or shutil.which("cc") or shutil.which("gcc")
+
+@pytest.mark.skipif(not CC, reason="no C compiler")
+def test_freq_engine(tmp_path):
+    exe = str(tmp_path / "freq_engine_test")
+    subprocess.run([CC, "-Wall", "-Werror", "-DFE_HOST_TEST", "-I" + ROOT_DIR, "-o", exe,
+                    os.path.join(TEST_DIR, "freq_engine_test.c"),
+                    os.path.join(ROOT_DIR, "freq_engine.c")], check=True)
+    result = subprocess.run([exe], stdout=subprocess.PIPE, universal_newlines=True)
+    assert result.returncode == 0, result.stdout
+
+# EOF
@@ -0,0 +1,69 @@
+# Tests for picofreq_host text and binary parsing
+
+import pytest
+from picofreq_host.parse import (StreamParser, encode_frame, split_records,
+                                 FRAME_LEN, MAX_LINE, NO_TICKS)
+
+def freqs(samples):
+    return [freq for ticks, freq in samples]
+
+@pytest.mark.parametrize("line, freq", [
+    (b"Frequency 100000 Hz\n", 100000.0),
+    (b"Gate 250.0 ms, count 25000, freq 100.0 kHz\n", 100000.0),
+    (b"9 samples, total 800000 us, freq 10.000 Hz\n", 10.0),
+    (b"FREQ 2.5 MHz\n", 2.5e6),
+    (b"frequency -3.5 Hz\n", -3.5),
+])
+def test_text_line(line, freq):
+    assert StreamParser().feed(line) == [(NO_TICKS, freq)]
+
+@pytest.mark.parametrize("line", [
+    b"FREQ 5 KHZ\n",
+    b"freq 5 mHz\n",
+    b"frequency 5 KHz\n",
+    b"Gate 250.0 ms, count 25000\n",
+    b"\n",
+])
+def test_text_no_match(line):
+    parser = StreamParser()
+    assert parser.feed(line) == []
+    assert parser.errors == 0
+
+def test_bad_unit_between_good_lines():
+    data = b"Frequency 100 Hz\nFREQ 5 KHZ\nFrequency 200 Hz\n"
+    assert freqs(StreamParser().feed(data)) == [100.0, 200.0]
+
+def test_frame():
+    parser = StreamParser()
+    frame = encode_frame(123456, 1234.5)
+    assert len(frame) == FRAME_LEN
+    assert parser.feed(frame) == [(123456, 1234.5)]
+
+def test_frame_ticks_wrap():
+    assert StreamParser().feed(encode_frame(-1, 1.0)) == [(0xffffffff, 1.0)]
+
+def test_frame_bad_checksum():
+    frame = bytearray(encode_frame(1, 2.0))
+    frame[-1] ^= 0xff
+    parser = StreamParser()
+    assert parser.feed(bytes(frame) + b"Frequency 7 Hz\n") == [(NO_TICKS, 7.0)]
+    assert parser.errors == 1
+
+def test_split_across_feeds():
+    data = b"Frequency 1 Hz\n" + encode_frame(5, 2.0) + b"freq 3.0 kHz\n"
+    parser, out = StreamParser(), []
+    for i in range(len(data)):
+        out += parser.feed(data[i:i+1])
+    assert out == [(NO_TICKS, 1.0), (5, 2.0), (NO_TICKS, 3000.0)]
+
+def test_long_line_discarded():
+    parser = StreamParser()
+    assert parser.feed(b"x" * (MAX_LINE + 1)) == []
+    assert parser.errors == 1
+    assert parser.feed(b"\nFrequency 9 Hz\n") == [(NO_TICKS, 9.0)]
+
+def test_split_records():
+    recs = [b"Frequency 1 Hz\n", encode_frame(1, 2.0), encode_frame(2, 3.0), b"freq 4 Hz\n"]
+    assert split_records(b"".join(recs)) == recs
+
+# EOF
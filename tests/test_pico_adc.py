@@ -0,0 +1,35 @@
+# Tests for pico_adc sample rate and frequency calculation
+
+import math, types, pytest
+import pico_adc
+
+# ADC registers, as attributes
+def fake_adc():
+    return types.SimpleNamespace(CS=types.SimpleNamespace(), FCS=types.SimpleNamespace(),
+                                 CS_REG=0, FCS_REG=0, DIV_REG=0)
+
+@pytest.mark.parametrize("rate, actual", [
+    (100e3, 100e3), (500e3, 500e3), (1e6, 500e3), (1000, 1000),
+    (100, 48e6 / (1 + 0xffffff / 256.0)), (0, 48e6 / (1 + 0xffffff / 256.0)),
+])
+def test_adc_rate(monkeypatch, rate, actual):
+    adc = fake_adc()
+    monkeypatch.setattr(pico_adc.devs, "ADC_DEVICE", adc, raising=False)
+    pico_adc.adc_init(0, rate)
+    assert 0 <= adc.DIV_REG <= pico_adc.ADC_DIV_MAX
+    assert pico_adc.adc_sample_rate(adc) == pytest.approx(actual, rel=1e-3)
+
+@pytest.mark.parametrize("amp", [2000, 30, 10])
+def test_adc_frequency(amp):
+    buff = pico_adc.devs.array16(4096)
+    for i in range(len(buff)):
+        buff[i] = int(2048 + amp * math.sin(2 * math.pi * 1234.5 * i / 100e3) + 0.5)
+    assert pico_adc.adc_frequency(buff, 100e3) == pytest.approx(1234.5, rel=1e-3)
+
+def test_adc_signal_too_small():
+    buff = pico_adc.devs.array16(4096)
+    for i in range(len(buff)):
+        buff[i] = 2048 + (3 if i % 80 < 40 else 0)
+    assert pico_adc.adc_frequency(buff, 100e3) == 0
+
+# EOF
@@ -0,0 +1,42 @@
+# Tests for pico_phase edge pairing and phase statistics
+
+import pytest
+import pico_phase
+
+REF_USEC, DUT_USEC = 1000, 1010
+DUT_OFFSET = 100
+
+# Get edge times of reference & DUT from given start time, as captured in a block
+def capture(start, nref, ndut):
+    r0 = -(-start // REF_USEC)
+    d0 = -(-(start - DUT_OFFSET) // DUT_USEC)
+    ref, dut = pico_phase.devs.array32(nref), pico_phase.devs.array32(ndut)
+    for i in range(nref):
+        ref[i] = (r0 + i) * REF_USEC
+    for i in range(ndut):
+        dut[i] = (d0 + i) * DUT_USEC + DUT_OFFSET
+    return ref, dut
+
+def test_edge_pairs_unwrap():
+    ref, dut = capture(5000, 256, 256)
+    res = pico_phase.devs.array32(5)
+    count = pico_phase.edge_pairs(ref, 256, dut, 256, res)
+    assert count == res[0] > 250
+    assert (res[3], res[4]) == (dut[0], dut[count-1])
+    # Phase increases by 0.01 cycle per edge, well past one cycle in the block
+    first = (dut[0] - ref[0]) % REF_USEC / REF_USEC
+    assert res[1] / res[2] == pytest.approx(first + (count - 1) * 0.01 / 2, abs=0.01)
+
+@pytest.mark.parametrize("gap", [0, 50000, 123456])
+def test_drift_with_gaps(gap):
+    stats = pico_phase.PhaseStats()
+    start = 5000
+    for n in range(10):
+        ref, dut = capture(start, 256, 256)
+        assert stats.add_block(ref, 256, dut, 256)
+        start = max(ref[255], dut[255]) + gap
+    assert stats.ratio() == pytest.approx(REF_USEC / DUT_USEC, rel=1e-6)
+    drift = 360.0 * (1e6 / REF_USEC - 1e6 / DUT_USEC)
+    assert stats.drift_rate() == pytest.approx(drift, rel=1e-3)
+
+# EOF
@@ -0,0 +1,60 @@
+# Tests for picofreq_host aggregator
+
+import asyncio, errno
+from picofreq_host.reader import Aggregator
+from picofreq_host.store import ColumnStore
+
+# Serve data on a local TCP port, then close the connection
+async def serve(data):
+    async def handle(reader, writer):
+        writer.write(data)
+        await writer.drain()
+        writer.close()
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, "127.0.0.1:%u" % server.sockets[0].getsockname()[1]
+
+def test_socket_sources(tmp_path):
+    async def run(agg):
+        server1, name1 = await serve(b"Frequency 100 Hz\nFREQ 5 KHZ\nFrequency 200 Hz\n")
+        server2, name2 = await serve(b"freq 1.5 kHz\n")
+        async with server1, server2:
+            await agg.run([name1, name2])
+    with ColumnStore(str(tmp_path)) as store:
+        agg = Aggregator(store)
+        asyncio.run(run(agg))
+        assert agg.samples == 3
+        assert sorted(store.query(0, 2**62)["freq"]) == [100.0, 200.0, 1500.0]
+
+def test_failed_source(tmp_path):
+    def on_sample(source, t_ns, ticks, freq):
+        if freq < 0:
+            raise ValueError("bad sample")
+    async def run(agg):
+        server1, name1 = await serve(b"Frequency -1 Hz\nFrequency 2 Hz\n")
+        server2, name2 = await serve(b"Frequency 3 Hz\nFrequency 4 Hz\n")
+        async with server1, server2:
+            await agg.run([name1, name2, str(tmp_path / "missing_tty")])
+        return name1
+    with ColumnStore(str(tmp_path / "store")) as store:
+        agg = Aggregator(store, on_sample)
+        name1 = asyncio.run(run(agg))
+        assert sorted(agg.failed) == sorted([name1, str(tmp_path / "missing_tty")])
+        assert sorted(store.query(0, 2**62)["freq"]) == [-1.0, 3.0, 4.0]
+
+def test_store_error(tmp_path):
+    def append(*args):
+        raise OSError(errno.ENOSPC, "No space left on device")
+    async def run(agg):
+        server1, name1 = await serve(b"Frequency 1 Hz\n")
+        async with server1:
+            await agg.run([name1])
+        return name1
+    with ColumnStore(str(tmp_path)) as store:
+        store.append = append
+        agg = Aggregator(store)
+        name1 = asyncio.run(run(agg))
+        assert list(agg.failed) == [name1]
+        assert agg.failed[name1].errno == errno.ENOSPC
+        assert agg.samples == 0
+
+# EOF
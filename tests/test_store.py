@@ -0,0 +1,46 @@
+# Tests for picofreq_host column store
+
+from picofreq_host.store import ColumnStore, CHUNK_ROWS
+
+def test_append_query(tmp_path):
+    with ColumnStore(str(tmp_path)) as store:
+        for n in range(10):
+            store.append(1000 + n*10, n % 2, n * 1.5, n)
+        res = store.query(1020, 1060)
+        assert list(res["t_ns"]) == [1020, 1030, 1040, 1050]
+        assert list(res["source"]) == [0, 1, 0, 1]
+        assert list(res["freq"]) == [3.0, 4.5, 6.0, 7.5]
+        assert list(res["ticks"]) == [2, 3, 4, 5]
+        assert len(store.query(0, 1000)["t_ns"]) == 0
+        assert len(store.query(2000, 3000)["t_ns"]) == 0
+
+def test_time_kept_ascending(tmp_path):
+    with ColumnStore(str(tmp_path)) as store:
+        store.append(100, 0, 1.0, -1)
+        store.append(90, 0, 2.0, -1)
+        assert list(store.query(0, 1000)["t_ns"]) == [100, 100]
+
+def test_reopen(tmp_path):
+    with ColumnStore(str(tmp_path)) as store:
+        assert store.source_number("a") == 0
+        assert store.source_number("b") == 1
+        store.append(5, 1, 10.0, 7)
+    with ColumnStore(str(tmp_path)) as store:
+        assert store.rows == 1
+        assert store.sources == ["a", "b"]
+        assert store.source_number("b") == 1
+        store.append(3, 0, 20.0, 8)
+        assert list(store.query(0, 10)["t_ns"]) == [5, 5]
+
+def test_extend(tmp_path):
+    nrows = CHUNK_ROWS + 10
+    with ColumnStore(str(tmp_path)) as store:
+        for n in range(nrows):
+            store.append(n, 0, float(n), n)
+        assert store.capacity >= nrows
+        res = store.query(CHUNK_ROWS - 5, CHUNK_ROWS + 5)
+        assert list(res["freq"]) == [float(n) for n in range(CHUNK_ROWS - 5, CHUNK_ROWS + 5)]
+    with ColumnStore(str(tmp_path)) as store:
+        assert store.rows == nrows
+
+# EOF